@@ -3,6 +3,8 @@ import numpy as np
 from os.path import exists
 from os import remove
 
+from minos.modules import input_cache
+
 
 class BaseHandler:
     def __init__(self, configuration):
@@ -18,7 +20,7 @@ class BaseHandler:
             self.cache()
         else:
             print('Fetching rate table from catch {}'.format(self.rate_table_path))
-            self.rate_table = pd.read_csv(self.rate_table_path, index_col=[0])
+            self.rate_table = input_cache.read_csv(self.rate_table_path, index_col=[0])
 
     def set_matrix_tables(self):
         self._build()
@@ -15,11 +15,10 @@ sex and ethnicity to ensure representative populations into the future.
 
 import pandas as pd
 import numpy as np
-from numpy.random import choice
 import random
 
 import US_utils
-from minos.modules import r_utils
+from minos.modules import native_utils
 
 
 # suppressing a warning that isn't a problem
@@ -102,23 +101,19 @@ def predict_education(repl):
     """
     print("Predicting max education level for replenishing populations...")
 
-    transition_model = r_utils.load_transitions(f"data/transitions/education/nnet/educ_nnet_2018_2019", "")
+    transition_model = native_utils.load_transitions(f"data/transitions/education/nnet/educ_nnet_2018_2019", "")
 
-    prob_df = r_utils.predict_highest_educ_nnet(transition_model, repl)
+    prob_df = native_utils.predict_highest_educ_nnet(transition_model, repl)
 
-    #repl['new_educ'] = choice(a = prob_df.columns, p = prob_df[repl.index])
-
-    repl['max_educ'] = np.nan
-
-    for i, distribution in enumerate(prob_df.iterrows()):
-        #repl.loc[i, 'max_educ']
-        # choice(a=prob_df.columns, p=distribution)
-        #print(distribution[1])
-        repl.loc[i, 'max_educ'] = choice(a=prob_df.columns, size=1, p=distribution[1])[0]
-        #print(test)
-
-    #new_educ = random.choices(population=prob_df.columns,
-    #                          weights=)
+    # Draw one level per row at once by comparing a uniform draw against each row's cumulative distribution.
+    cumulative = prob_df.cumsum(axis=1).to_numpy()
+    draws = np.random.random((len(prob_df), 1))
+    # Clip in case rounding leaves the final cumulative probability just below a draw.
+    chosen = np.minimum((draws > cumulative).sum(axis=1), len(prob_df.columns) - 1)
+    max_educ = prob_df.columns.to_numpy(dtype=object)[chosen]
+    # No draw for anyone missing a predictor.
+    max_educ[prob_df.isna().any(axis=1).to_numpy()] = np.nan
+    repl['max_educ'] = max_educ
 
     return repl
 
@@ -17,6 +17,7 @@ import pandas as pd
 import numpy as np
 
 import US_utils
+from minos.modules.cohort_loader import cohort_path, write_metadata
 
 
 # suppressing a warning that isn't a problem
@@ -78,6 +79,9 @@ def generate_stock(projections):
     data['max_educ'] = data['education_state']
 
     US_utils.save_multiple_files(data, years, "data/final_US/", "")
+    # Row counts etc. for MINOS to read without parsing each cohort. See minos.modules.cohort_loader.
+    for year in years:
+        write_metadata(cohort_path("data/final_US", year), data.loc[data["time"] == year])
 
 
 def main():
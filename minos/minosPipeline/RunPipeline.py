@@ -7,6 +7,15 @@ from pathlib import Path
 from vivarium import InteractiveContext
 
 import minos.utils as utils
+from minos.minosPipeline.checkpoint import CheckpointStore, copy_warm_start_output
+from minos.minosPipeline.exit_archive import ExitArchive
+from minos.minosPipeline.output_files import get_output_writer, BackgroundWriter
+from minos.minosPipeline.panel_store import PanelStore
+from minos.modules.model_cache import transition_models
+from minos.modules.population_index import population_index
+from minos.modules.population_schema import schema
+from minos.modules.scheduler import TimeStepScheduler
+from minos.modules.unique_profiles import profiles
 
 from minos.modules.mortality import Mortality
 from minos.modules.replenishment import Replenishment
@@ -32,7 +41,7 @@ from minos.modules.intervention import energyDownlift
 # for viz.
 from minos.validation.minos_distribution_visualisation import *
 
-def RunPipeline(config, run_output_dir, intervention=None):
+def RunPipeline(config, run_output_dir, intervention=None, resume=False, warm_up=None, fork_from=None):
     """ Run the daedalus Microsimulation pipeline
 
    Parameters
@@ -41,6 +50,14 @@ def RunPipeline(config, run_output_dir, intervention=None):
         Config file to run the pipeline
     run_output_dir : String
         Directory
+    intervention : str
+        Name of the intervention module to add, if any.
+    resume : bool
+        Carry on from the latest checkpoint in run_output_dir if there is one.
+    warm_up : int
+        Only simulate this many years and save them as a warm start other scenarios can fork from.
+    fork_from : str
+        Output directory of a warm up run. Carry on from its warm start instead of simulating the years before it.
     Returns
     --------
      A dataframe with the resulting simulation
@@ -97,6 +114,18 @@ def RunPipeline(config, run_output_dir, intervention=None):
     if "replenishmentNowcast()" in config['components']:
         components.append(replenishmentNowcast())
 
+    # Optionally run modules of the same time step priority concurrently where their columns do not overlap.
+    # Modules register with the scheduler during setup so it must be given to them first.
+    scheduler = None
+    time_step_workers = config.time_step_workers if 'time_step_workers' in config else 1
+    if time_step_workers > 1:
+        if 'transition_backend' in config and config.transition_backend == 'r':
+            logging.warning("time_step_workers is ignored with the r transition backend. Running modules serially.")
+        else:
+            scheduler = TimeStepScheduler(time_step_workers)
+            for component in components:
+                component.scheduler = scheduler
+
     # Initiate vivarium simulation object but DO NOT setup yet.
     simulation = InteractiveContext(components=components,
                                     configuration=config,
@@ -118,6 +147,24 @@ def RunPipeline(config, run_output_dir, intervention=None):
         print(f"Presetup done for: {component}")
         logging.info(f"\t{component}")
 
+    # Store the population with compact column types unless turned off. Views are typed when modules set up.
+    schema.enabled = config.population_schema if 'population_schema' in config else True
+    # Predict transition models once per unique covariate profile unless turned off.
+    profiles.enabled = config.unique_profiles if 'unique_profiles' in config else True
+
+    # Start embedded R once up front if transition models are predicted through R.
+    # Packages, converters and R function handles are then reused by every module and year.
+    r_session = None
+    if 'transition_backend' in config and config.transition_backend == 'r':
+        from minos.modules import r_utils
+        r_session = r_utils.session
+        r_session.start(config.r_data_exchange if 'r_data_exchange' in config else 'auto')
+        logging.info(f"Started R session in {r_session.startup_time:.2f} seconds using {r_session.exchange} exchange")
+        # Optionally predict over row chunks in parallel R worker processes.
+        if 'r_workers' in config and config.r_workers > 1:
+            min_rows = config.r_worker_min_rows if 'r_worker_min_rows' in config else 10000
+            r_utils.worker_pool.start(config.r_workers, r_session.exchange, min_rows)
+
     # Print start time for entire simulation.
     print('Start simulation setup')
     start_time = utils.get_time()
@@ -125,6 +172,8 @@ def RunPipeline(config, run_output_dir, intervention=None):
     logging.info(f'Running simulation setup...')
 
     # Run setup method for each module.
+    # Alive and other indexed subsets are recorded from scratch as the starting population is created.
+    population_index.clear()
     simulation.setup()
 
     # Print time when modules are setup and the simulation starts.
@@ -132,9 +181,51 @@ def RunPipeline(config, run_output_dir, intervention=None):
     print(f'Simulation loop start at {config_time}')
 
 
+    # Add experiment parameters to output file names if present
+    output_prefix = ""
+    if 'experiment_parameters' in config.keys():
+        print(config.experiment_parameters)
+        output_prefix += str(config.experiment_parameters + '_')
+        output_prefix += str(config.experiment_parameters_names + '_')
+
+    # Optionally checkpoint the simulation every checkpoint_interval years so a stopped run can be resumed.
+    checkpoints = CheckpointStore(os.path.join(config.run_output_dir, 'checkpoints'), output_prefix)
+    checkpoint_interval = config.checkpoint_interval if 'checkpoint_interval' in config else 0
+    years_done = checkpoints.restore(simulation, components) if resume else 0
+    # Fork from a baseline warm start unless resuming past it. The baseline's output before the fork is copied over.
+    if fork_from and years_done == 0:
+        warm_start = CheckpointStore(os.path.join(fork_from, 'warm_start'), output_prefix)
+        years_done = warm_start.restore(simulation, components, fork=True)
+        copy_warm_start_output(fork_from, config.run_output_dir, output_prefix,
+                               range(config.time.start.year + 1, config.time.start.year + years_done + 1))
+
+    # Yearly population output format. A panel store gets every year of the run instead of one file per year.
+    output_format = config.output_format if 'output_format' in config else 'parquet'
+    if output_format == 'panel':
+        writer = PanelStore(os.path.join(config.run_output_dir, f"{output_prefix}panel"))
+        # Drop years written after the checkpoint or warm start by the run being resumed.
+        if resume or fork_from:
+            writer.rollback(config.time.start.year + years_done)
+    else:
+        writer = get_output_writer(output_format)
+    # Write output on a background thread while the next year runs unless output_queue_size is 0.
+    output_queue_size = config.output_queue_size if 'output_queue_size' in config else 2
+    if output_queue_size > 0:
+        writer = BackgroundWriter(writer, output_queue_size)
+
+    # Archive and untrack simulants at the end of the year they die unless compact_exited is false.
+    archive = None
+    compact_exited = config.compact_exited if 'compact_exited' in config else True
+    if compact_exited:
+        archive = ExitArchive(os.path.join(config.run_output_dir, 'archive'),
+                              get_output_writer('parquet' if output_format == 'panel' else output_format),
+                              output_prefix,
+                              config.time.start.year + years_done if years_done > 0 else None)
+
     logging.info('Simulation loop start...')
     # Loop over years in the model duration. Step the model forwards a year and save data/metrics.
-    for year in range(1, config.time.num_years + 1):
+    last_year = config.time.num_years if warm_up is None else min(warm_up, config.time.num_years)
+    for year in range(years_done + 1, last_year + 1):
 
         logging.info(f'Begin simulation for year {config.time.start.year + year}')
 
@@ -152,20 +243,12 @@ def RunPipeline(config, run_output_dir, intervention=None):
         pop = utils.get_age_bucket(pop)
 
         # File name and save.
-        output_data_filename = ""
-
-        # Add experiment parameters to output file name if present
-        if 'experiment_parameters' in config.keys():
-            print(config.experiment_parameters)
-            output_data_filename += str(config.experiment_parameters + '_')
-            output_data_filename += str(config.experiment_parameters_names + '_')
-
-        # Now add year to output file name
-        output_data_filename += f"{config.time.start.year + year}.csv"
-        output_file_path = os.path.join(config.run_output_dir, output_data_filename)
-        pop.to_csv(output_file_path)
-        print("Saved data to: ", output_file_path)
-        logging.info(f"Saved data to: {output_file_path}")
+        if output_format == 'panel':
+            writer.write(pop, config.time.start.year + year)
+        else:
+            output_data_filename = f"{output_prefix}{config.time.start.year + year}{writer.extension}"
+            output_file_path = os.path.join(config.run_output_dir, output_data_filename)
+            writer.write(pop, output_file_path)
 
         # Print some summary stats on the simulation.
         print('alive', len(pop[pop['alive'] == 'alive']))
@@ -174,8 +257,10 @@ def RunPipeline(config, run_output_dir, intervention=None):
         # Print metrics for desired module.
         # TODO: this can be extended towards a generalised metrics method for each module.
         if 'Mortality()' in config.components:
-            print('dead', len(pop[pop['alive'] == 'dead']))
-            logging.info(f"Total dead: {len(pop[pop['alive'] == 'dead'])}")
+            # Simulants who died in earlier years have been archived so are no longer in pop.
+            dead = len(pop[pop['alive'] == 'dead']) + (archive.archived if archive else 0)
+            print('dead', dead)
+            logging.info(f"Total dead: {dead}")
         if 'FertilityAgeSpecificRates()' in config.components:
             print('New children', len(pop[pop['parent_id'] != -1]))
             logging.info(f"New children: {len(pop[pop['parent_id'] != -1])}")
@@ -183,4 +268,38 @@ def RunPipeline(config, run_output_dir, intervention=None):
         #for component in components:
         #    component.plot(pop, config)
 
+        # Move simulants who died this year out of the active population.
+        if archive:
+            archive.compact(simulation, config.time.start.year + year)
+
+        # Checkpoint once this year's output has been written so resuming never skips a year of output.
+        if checkpoint_interval > 0 and year % checkpoint_interval == 0 and year < config.time.num_years:
+            if isinstance(writer, BackgroundWriter):
+                writer.flush()
+            checkpoints.save(simulation, components, year)
+
+        # Report how often transition models were reused rather than read from disk.
+        logging.info(f"Transition model cache: {transition_models.stats()}")
+        logging.info(f"Unique covariate profiles: {profiles.stats()['total']}")
+        if r_session:
+            logging.info(f"Time in R: {r_session.timings()}")
+
+    # Finish writing any queued output. Raises if a write failed.
+    if isinstance(writer, BackgroundWriter):
+        writer.close()
+    if warm_up is not None:
+        CheckpointStore(os.path.join(config.run_output_dir, 'warm_start'), output_prefix).save(simulation, components,
+                                                                                               last_year)
+    if scheduler:
+        scheduler.close()
+    # Stop reading replenishing cohorts ahead.
+    for component in components:
+        if hasattr(component, 'replenishing'):
+            component.replenishing.close()
+    print(f"Transition model cache: {transition_models.stats()}")
+    print(f"Unique covariate profiles: {profiles.stats()}")
+    if r_session:
+        print(f"Time in R: {r_session.timings()}")
+        r_utils.worker_pool.close()
+
     return simulation
@@ -0,0 +1,209 @@
+"""
+Checkpoints of a running simulation at year boundaries.
+
+A checkpoint holds everything that changes while a simulation runs:
+
+- the whole population table, including untracked simulants,
+- the simulation clock,
+- the common random numbers index mapping simulants to random draws,
+- numpy's global random state (used by the zero inflated models),
+- each module's own state from Base.get_state (randomness stream keys, the replenishment year etc.).
+
+Everything else (rate tables, lookup tables, transition models, event listeners) is rebuilt by simulation.setup(), so
+a resumed run sets the simulation up as normal, restores the latest checkpoint over it and carries on from the next
+year with the same results as an uninterrupted run.
+
+Checkpoints are written with checkpoint_interval in the config and restored with --resume in scripts/run.py.
+
+Scenarios can also be forked from a warm start: a checkpoint of a baseline run after its first years. Each
+intervention sets up its own simulation, restores the warm start over it and initialises the columns of any module
+the baseline did not have (e.g. income_boosted for an uplift). Interventions then start from the fork year with the
+same population, randomness and history as the baseline. See run_scenarios in scripts/run.py.
+"""
+
+import glob
+import logging
+import os
+import pickle
+import re
+import shutil
+
+import numpy as np
+
+from minos.minosPipeline.output_files import find_output_files
+from minos.modules.population_index import population_index
+
+# Increase whenever the contents of a checkpoint change.
+FORMAT_VERSION = 1
+
+
+def vivarium_version():
+    import vivarium
+    return vivarium.__version__
+
+
+class CheckpointStore:
+    """ Saves and restores checkpoints of one run in a directory."""
+
+    def __init__(self, path, prefix=''):
+        """
+        Parameters
+        ----------
+        path : str
+            Directory checkpoints are written to.
+        prefix : str
+            Start of checkpoint file names. Keeps runs of a batch that share an output directory apart.
+        """
+        self.path = path
+        self.prefix = prefix
+
+    def checkpoint_path(self, year):
+        return os.path.join(self.path, f"{self.prefix}year_{year}.pkl")
+
+    def years(self):
+        """ Years with a saved checkpoint, in order."""
+        pattern = re.compile(re.escape(self.prefix) + r"year_(\d+)\.pkl$")
+        files = glob.glob(os.path.join(self.path, f"{glob.escape(self.prefix)}year_*.pkl"))
+        return sorted(int(match.group(1)) for match in map(pattern.search, files) if match)
+
+    def save(self, simulation, components, year):
+        """ Checkpoint the simulation after a year has finished.
+
+        The file is written under a temporary name and moved into place so a job stopped mid write never leaves a
+        broken checkpoint. Older checkpoints of the run are then removed.
+
+        Parameters
+        ----------
+        simulation : vivarium.interface.interactive.InteractiveContext
+            Running simulation.
+        components : list
+            MINOS modules in the simulation.
+        year : int
+            Number of years simulated so far.
+        """
+        # Checkpoints hold vivarium's private simulation state, so they only restore into the same vivarium version.
+        state = {'format_version': FORMAT_VERSION,
+                 'vivarium_version': vivarium_version(),
+                 'year': year,
+                 'population': simulation._population._population,
+                 'clock': dict(vars(simulation._clock)),
+                 'key_mapping': dict(vars(simulation._randomness._key_mapping)),
+                 'numpy_random': np.random.get_state(),
+                 'modules': {str(component): component.get_state()
+                             for component in components if hasattr(component, 'get_state')}}
+
+        os.makedirs(self.path, exist_ok=True)
+        path = self.checkpoint_path(year)
+        with open(path + '.tmp', 'wb') as checkpoint_file:
+            pickle.dump(state, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        for old_year in self.years():
+            if old_year < year:
+                os.remove(self.checkpoint_path(old_year))
+        logging.info(f"Saved checkpoint to {path}")
+
+    def restore(self, simulation, components, fork=False):
+        """ Restore the latest checkpoint over a simulation that has just been set up.
+
+        Parameters
+        ----------
+        simulation : vivarium.interface.interactive.InteractiveContext
+            Simulation after simulation.setup().
+        components : list
+            MINOS modules in the simulation. Must be the same modules the checkpoint was saved with unless forking.
+        fork : bool
+            Restore a warm start into a scenario with extra modules. Modules with no saved state keep their own and
+            initialise their columns for the whole restored population.
+
+        Returns
+        -------
+        int
+            Number of years simulated when the checkpoint was saved. 0 if there is no checkpoint.
+
+        Raises
+        ------
+        RuntimeError
+            If the checkpoint was saved in another checkpoint format or with another version of vivarium.
+        """
+        years = self.years()
+        if not years:
+            logging.info(f"No checkpoint found in {self.path}. Starting from the beginning.")
+            return 0
+        path = self.checkpoint_path(years[-1])
+        with open(path, 'rb') as checkpoint_file:
+            state = pickle.load(checkpoint_file)
+        if state.get('format_version') != FORMAT_VERSION:
+            raise RuntimeError(f"Checkpoint {path} has format version {state.get('format_version')} but version "
+                               f"{FORMAT_VERSION} is required. Start the run again without resuming.")
+        if state.get('vivarium_version') != vivarium_version():
+            raise RuntimeError(f"Checkpoint {path} was saved with vivarium {state.get('vivarium_version')} but "
+                               f"vivarium {vivarium_version()} is installed. Restore it with the same vivarium version.")
+
+        setup_population = simulation._population._population
+        population = state['population']
+        # Columns only created by modules the checkpoint did not have. Filled in by those modules below.
+        new_columns = setup_population.columns.difference(population.columns)
+        if len(new_columns) > 0:
+            population = population.assign(**{column: np.nan for column in new_columns})
+        simulation._population._population = population
+        # Update in place. Randomness streams and the clock are referenced by every module.
+        vars(simulation._clock).update(state['clock'])
+        vars(simulation._randomness._key_mapping).update(state['key_mapping'])
+        np.random.set_state(state['numpy_random'])
+        for component in components:
+            if str(component) in state['modules']:
+                component.set_state(state['modules'][str(component)])
+            elif fork:
+                self.initialize_new_module(simulation, component, population.index)
+            elif hasattr(component, 'set_state'):
+                raise RuntimeError(f"Checkpoint {path} has no state for {component}. "
+                                   f"Resume with the same modules the run was started with.")
+        population_index.rebuild(simulation._population._population)
+        logging.info(f"Resumed from checkpoint {path} after {state['year']} years.")
+        return state['year']
+
+    @staticmethod
+    def initialize_new_module(simulation, component, index):
+        """ Initialise a module's columns for every simulant of a restored warm start.
+
+        The module is given the same user data as when the starting population is created in simulation.setup(), so
+        initialisers that branch on sim_state or cohort_type take their setup branch.
+        """
+        from vivarium.framework.population import SimulantData
+
+        if not hasattr(component, 'on_initialize_simulants'):
+            return
+        clock = simulation._clock
+        user_data = {'sim_state': 'setup', 'cohort_type': 'initialise'}
+        pop_data = SimulantData(index, user_data, clock.time, clock.step_size)
+        component.on_initialize_simulants(pop_data)
+        logging.info(f"Initialised {component} for the forked population.")
+
+
+def copy_warm_start_output(source, target, prefix, years):
+    """ Copy a warm start's output for the years before the fork into a scenario's output directory.
+
+    Parameters
+    ----------
+    source : str
+        Output directory of the baseline run the warm start was taken from.
+    target : str
+        Output directory of the scenario.
+    prefix : str
+        Start of output file names of the run.
+    years : list
+        Simulated years before the fork.
+    """
+    if os.path.abspath(source) == os.path.abspath(target):
+        return
+    os.makedirs(target, exist_ok=True)
+    for year in years:
+        for file in find_output_files(source, year, glob.escape(prefix)):
+            shutil.copy2(file, target)
+        for file in find_output_files(os.path.join(source, 'archive'), year, glob.escape(prefix) + 'exited_'):
+            os.makedirs(os.path.join(target, 'archive'), exist_ok=True)
+            shutil.copy2(file, os.path.join(target, 'archive'))
+    panel = os.path.join(source, f"{prefix}panel")
+    if os.path.exists(panel):
+        # Years after the fork are dropped by PanelStore.rollback.
+        shutil.copytree(panel, os.path.join(target, f"{prefix}panel"), dirs_exist_ok=True)
@@ -0,0 +1,124 @@
+"""
+Archive of simulants who have left the simulation.
+
+Simulants who die stay in the population table for the rest of the run. Every query filters them out again and every
+yearly output repeats them. At the end of each year the archive writes the simulants who died that year, with their
+exit time and cause of death, to one segment file and untracks them. Vivarium's population views and
+simulation.get_population() skip untracked simulants, so modules and output only see active simulants from then on.
+
+Vivarium indexes simulants by their row in the population table, so archived rows cannot be physically removed. They
+stay in the table untracked and are never read again by the simulation. Use full_population to rebuild the whole
+population including archived simulants.
+
+Set compact_exited: false in the config to keep dead simulants in the active population as before.
+"""
+
+import glob
+import logging
+import os
+import re
+
+import pandas as pd
+
+from minos.minosPipeline.output_files import find_output_files, read_output
+
+
+class ExitArchive:
+    """ Archives exited simulants of one run to segment files."""
+
+    def __init__(self, path, writer, prefix='', last_year=None):
+        """
+        Parameters
+        ----------
+        path : str
+            Directory of archive segments.
+        writer : CSVWriter or ParquetWriter
+            Writer used for each segment.
+        prefix : str
+            Start of segment file names. Keeps runs of a batch that share an output directory apart.
+        last_year : int
+            Last year already simulated by a resumed or forked run. Simulants in its segments up to this year are
+            counted as archived. None for a new run.
+        """
+        self.path = path
+        self.writer = writer
+        self.prefix = prefix
+        # Number of simulants archived by this run so far.
+        self.archived = 0 if last_year is None else self.count(last_year)
+
+    def compact(self, simulation, year):
+        """ Archive and untrack simulants who have died since the last compaction.
+
+        Parameters
+        ----------
+        simulation : vivarium.interface.interactive.InteractiveContext
+            Running simulation.
+        year : int
+            Simulated year. Names the segment.
+
+        Returns
+        -------
+        int
+            Number of simulants archived.
+        """
+        table = simulation._population._population
+        exited = table.index[table['tracked'] & (table['alive'] == 'dead').to_numpy()]
+        if len(exited) == 0:
+            return 0
+        os.makedirs(self.path, exist_ok=True)
+        # Simulant indices are kept as a column so csv and parquet segments read back the same way.
+        segment = table.loc[exited].drop(columns='tracked').rename_axis('simulant').reset_index()
+        self.writer.write(segment, os.path.join(self.path, f"{self.prefix}exited_{year}{self.writer.extension}"))
+        table.loc[exited, 'tracked'] = False
+        self.archived += len(exited)
+        logging.info(f"Archived {len(exited)} exited simulants.")
+        return len(exited)
+
+    def segments(self):
+        """ Segment files of the run and the year of each."""
+        pattern = re.compile(re.escape(self.prefix) + r"exited_(\d+)\.")
+        files = find_output_files(self.path, '*', glob.escape(self.prefix) + 'exited_')
+        return [(file, int(pattern.match(os.path.basename(file)).group(1))) for file in files]
+
+    def count(self, last_year):
+        """ Number of simulants in the run's segments up to and including a year."""
+        return sum(len(read_output(file, columns=['simulant'])) for file, year in self.segments() if year <= last_year)
+
+    def read(self, columns=None):
+        """ Read every archived simulant.
+
+        Parameters
+        ----------
+        columns : list
+            Only read these columns. Reads all columns if None.
+
+        Returns
+        -------
+        pd.DataFrame
+            Archived simulants indexed by simulant.
+        """
+        files = find_output_files(self.path, '*', glob.escape(self.prefix) + 'exited_')
+        if not files:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name='simulant'))
+        read_columns = None if columns is None else ['simulant'] + list(columns)
+        return pd.concat([read_output(file, columns=read_columns) for file in files]).set_index('simulant')
+
+    def full_population(self, simulation, columns=None):
+        """ Active population together with every archived simulant, in simulant order.
+
+        Parameters
+        ----------
+        simulation : vivarium.interface.interactive.InteractiveContext
+            Running simulation.
+        columns : list
+            Only include these columns. Includes all columns if None.
+
+        Returns
+        -------
+        pd.DataFrame
+            Whole population as it would be without compaction.
+        """
+        active = simulation.get_population()
+        if columns is not None:
+            active = active[columns]
+        return pd.concat([active, self.read(columns)]).sort_index()
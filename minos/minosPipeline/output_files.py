@@ -0,0 +1,223 @@
+"""
+Writing and reading the yearly population files output by MINOS runs.
+
+RunPipeline writes the whole population at the end of every simulated year using the writer chosen by output_format
+in the config:
+
+- parquet: columnar, compressed and typed. Low cardinality string columns (sex, ethnicity, region, alive,
+  labour_state etc.) are dictionary encoded as categoricals. Needs pyarrow.
+- csv: one plain text csv per year as before.
+- panel: one append-only longitudinal store per run instead of yearly snapshots. See panel_store.
+
+Writers can be wrapped in a BackgroundWriter so each year is written on a separate thread while the next year is
+simulated.
+
+Validation and aggregation scripts should find and read output with find_output_files and read_output so they work
+with either format. Parquet output can also be read one column at a time.
+"""
+
+import atexit
+import glob
+import logging
+import os
+import queue
+import threading
+
+import pandas as pd
+
+# Output file extensions in the order they are searched for.
+OUTPUT_EXTENSIONS = ('.parquet', '.csv')
+
+# String columns stored as categoricals in parquet output.
+CATEGORICAL_COLUMNS = ['sex', 'ethnicity', 'region', 'alive', 'labour_state', 'cause_of_death', 'age_bucket']
+
+
+class CSVWriter:
+    """ Writes each year's population to a csv file."""
+
+    extension = '.csv'
+
+    def write(self, pop, path):
+        pop.to_csv(path)
+
+
+class ParquetWriter:
+    """ Writes each year's population to a compressed parquet file with typed and dictionary encoded columns."""
+
+    extension = '.parquet'
+
+    def __init__(self, compression='zstd'):
+        """
+        Parameters
+        ----------
+        compression : str
+            Parquet compression codec.
+
+        Raises
+        ------
+        ImportError
+            If pyarrow is not installed.
+        """
+        # Fail here rather than after the first simulated year if pyarrow is missing.
+        import pyarrow
+        self.compression = compression
+
+    @staticmethod
+    def prepare(pop):
+        """ Convert columns to types parquet can store compactly.
+
+        Enumerations in CATEGORICAL_COLUMNS become categoricals. Any other object column holding values other than
+        strings (e.g. a mix of strings and numbers) is converted to pandas strings, which arrow cannot otherwise store.
+        """
+        dtypes = {}
+        for column in pop.columns[pop.dtypes == object]:
+            if column in CATEGORICAL_COLUMNS:
+                dtypes[column] = 'category'
+            elif pd.api.types.infer_dtype(pop[column], skipna=True) not in ('string', 'empty'):
+                dtypes[column] = 'string'
+        return pop.astype(dtypes) if dtypes else pop
+
+    def write(self, pop, path):
+        self.prepare(pop).to_parquet(path, compression=self.compression)
+
+
+class BackgroundWriter:
+    """ Writes output on a background thread so simulating the next year overlaps with writing the last.
+
+    Populations are copied when queued so the simulation can keep changing its own. The queue is bounded. If
+    writing falls behind, write blocks until a queued population has been written, so no more than maxsize copies
+    are held at once. An error on the writer thread is raised by the next call to write or close, and nothing
+    else is written after it.
+    """
+
+    def __init__(self, writer, maxsize=2):
+        """
+        Parameters
+        ----------
+        writer : CSVWriter, ParquetWriter or minos.minosPipeline.panel_store.PanelStore
+            Writer used on the background thread.
+        maxsize : int
+            Largest number of populations waiting to be written.
+        """
+        self.writer = writer
+        self.extension = writer.extension
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="minos_output_writer", daemon=True)
+        self.thread.start()
+        # Flush anything still queued if a run ends without calling close. Unregistered by close.
+        atexit.register(self.close)
+
+    def run(self):
+        """ Write queued populations until closed."""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                pop, target = item
+                if self.error is None:
+                    self.writer.write(pop, target)
+                    logging.info(f"Saved data to: {target}")
+            except Exception as error:
+                logging.exception(f"Failed to write output to {target}")
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        """ Raise an error if a background write has failed."""
+        if self.error is not None:
+            raise RuntimeError("Writing MINOS output failed on the background writer thread.") from self.error
+
+    def write(self, pop, target):
+        """ Queue a copy of pop to be written. Blocks while the queue is full.
+
+        target is passed on to the wrapped writer. A file path, or the year for a panel store.
+        """
+        self.check()
+        if self.closed:
+            raise RuntimeError("Cannot write output after the background writer is closed.")
+        self.queue.put((pop.copy(), target))
+
+    def flush(self):
+        """ Wait for every queued population to be written."""
+        self.queue.join()
+        self.check()
+
+    def close(self):
+        """ Wait for every queued population to be written and stop the writer thread."""
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self.queue.put(None)
+        self.thread.join()
+        self.check()
+
+
+def get_output_writer(output_format='parquet'):
+    """ Writer for an output format.
+
+    Parameters
+    ----------
+    output_format : str
+        'parquet' or 'csv'. parquet falls back to csv with a warning if pyarrow is not installed.
+
+    Returns
+    -------
+    CSVWriter or ParquetWriter
+    """
+    if output_format == 'parquet':
+        try:
+            return ParquetWriter()
+        except ImportError:
+            logging.warning("pyarrow is not installed so parquet output cannot be written. Writing csv instead.")
+            return CSVWriter()
+    elif output_format == 'csv':
+        return CSVWriter()
+    raise ValueError(f"Unknown output_format '{output_format}'. Use 'parquet' or 'csv'.")
+
+
+def find_output_files(source, year, pattern='*'):
+    """ Output files in a directory for a given year, in any output format.
+
+    Parameters
+    ----------
+    source : str
+        Output directory of a MINOS run. E.g. output/baseline/2022_01_01_12_00_00
+    year : int
+        Simulated year.
+    pattern : str
+        Glob pattern for the start of the file name. E.g. run_id_1_ for a single batch run.
+
+    Returns
+    -------
+    list
+        Sorted output file paths.
+    """
+    files = []
+    for extension in OUTPUT_EXTENSIONS:
+        files += glob.glob(os.path.join(source, f"{pattern}{year}{extension}"))
+    return sorted(files)
+
+
+def read_output(filename, columns=None):
+    """ Read a yearly output file written in any output format.
+
+    Parameters
+    ----------
+    filename : str
+        Path to a .parquet or .csv output file.
+    columns : list
+        Only read these columns. Reads all columns if None.
+
+    Returns
+    -------
+    pd.DataFrame
+        Output population.
+    """
+    if filename.endswith('.parquet'):
+        return pd.read_parquet(filename, columns=columns)
+    return pd.read_csv(filename, usecols=columns, low_memory=False)
@@ -0,0 +1,235 @@
+"""
+Append-only longitudinal store of one MINOS run's population.
+
+Yearly snapshot files repeat every simulant's static attributes and the unchanged rows of everyone who has died each
+year, and following a simulant over time means joining every year's file. A panel store records each run once:
+
+- static/<year>.parquet: attributes that never change (pidp, sex, ethnicity, birth date etc.) for simulants first
+  seen that year.
+- years/<year>.parquet: time varying columns of simulants alive at the end of that year.
+- exits/<year>.parquet: the final row of simulants who died that year. They are not written again.
+- index.parquet: one row per simulant with its pidp, first and last year recorded and the year it exited if it has.
+
+Every chunk is indexed by the simulant's row in the vivarium population (simulant) rather than pidp because pidp is
+not guaranteed unique once replenishment adds new cohorts. The index maps pidps to simulants so trajectories only read
+the years each simulant was alive.
+
+Set output_format: "panel" in the config to write a panel store instead of yearly snapshots.
+"""
+
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from minos.minosPipeline.output_files import ParquetWriter
+
+# Columns written once per simulant when they are first seen.
+STATIC_COLUMNS = ['pidp', 'sex', 'ethnicity', 'birth_month', 'birth_year', 'entrance_time', 'parent_id']
+
+
+class PanelStore:
+    """ Writes and reads the panel store of one MINOS run."""
+
+    def __init__(self, path, static_columns=STATIC_COLUMNS, compression='zstd'):
+        """
+        Parameters
+        ----------
+        path : str
+            Directory of the store. Created on the first write. An existing store is appended to.
+        static_columns : list
+            Population columns that never change for a simulant.
+        compression : str
+            Parquet compression codec.
+
+        Raises
+        ------
+        ImportError
+            If pyarrow is not installed.
+        """
+        # Fail here rather than after the first simulated year if pyarrow is missing.
+        import pyarrow
+        self.compression = compression
+        self.path = path
+        self.static_columns = static_columns
+        index_path = os.path.join(path, 'index.parquet')
+        if os.path.exists(index_path):
+            self.index = pd.read_parquet(index_path)
+        else:
+            self.index = pd.DataFrame({'pidp': pd.Series(dtype='int64'),
+                                       'first_year': pd.Series(dtype='int64'),
+                                       'last_year': pd.Series(dtype='int64'),
+                                       'exit_year': pd.Series(dtype='float64')},
+                                      index=pd.Index([], dtype='int64', name='simulant'))
+
+    def chunk_path(self, kind, year):
+        return os.path.join(self.path, kind, f"{year}.parquet")
+
+    def write_chunk(self, frame, kind, year):
+        os.makedirs(os.path.join(self.path, kind), exist_ok=True)
+        # index=True stores simulant as a column even for a range index so reads can filter on it.
+        ParquetWriter.prepare(frame.rename_axis('simulant')).to_parquet(self.chunk_path(kind, year),
+                                                                         compression=self.compression, index=True)
+
+    def write(self, pop, year):
+        """ Append one year's population.
+
+        Parameters
+        ----------
+        pop : pd.DataFrame
+            Whole population at the end of the year as returned by simulation.get_population.
+        year : int
+            Simulated year.
+        """
+        exited = self.index.index[self.index['exit_year'].notna()]
+        current = pop.loc[~pop.index.isin(exited)]
+        new = current.loc[~current.index.isin(self.index.index)]
+        static = [column for column in self.static_columns if column in pop.columns]
+        varying = [column for column in pop.columns if column not in static]
+        if 'alive' in current.columns:
+            died = (current['alive'] == 'dead').to_numpy()
+        else:
+            died = np.zeros(len(current), dtype=bool)
+
+        if len(new) > 0:
+            self.write_chunk(new[static], 'static', year)
+        self.write_chunk(current.loc[~died, varying], 'years', year)
+        if died.any():
+            self.write_chunk(current.loc[died, varying], 'exits', year)
+
+        new_index = pd.DataFrame({'pidp': new['pidp'] if 'pidp' in new.columns else -1,
+                                  'first_year': year,
+                                  'last_year': year,
+                                  'exit_year': np.nan},
+                                 index=new.index.rename('simulant'))
+        index = pd.concat([self.index, new_index]) if len(self.index) > 0 else new_index
+        index.loc[current.index, 'last_year'] = year
+        index.loc[current.index[died], 'exit_year'] = year
+        self.index = index
+        # Written last so a store is never indexed past the chunks actually written.
+        index.to_parquet(os.path.join(self.path, 'index.parquet'))
+
+    def rollback(self, year):
+        """ Remove everything written after a year so a resumed run can write those years again.
+
+        Parameters
+        ----------
+        year : int
+            Last simulated year to keep.
+        """
+        for kind in ('static', 'years', 'exits'):
+            for later_year in self.years(kind):
+                if later_year > year:
+                    os.remove(self.chunk_path(kind, later_year))
+        index = self.index.loc[self.index['first_year'] <= year].copy()
+        index['last_year'] = index['last_year'].clip(upper=year)
+        index.loc[index['exit_year'] > year, 'exit_year'] = np.nan
+        self.index = index
+        if os.path.exists(self.path):
+            index.to_parquet(os.path.join(self.path, 'index.parquet'))
+
+    def years(self, kind='years'):
+        """ Years with a chunk of the given kind, in order."""
+        files = glob.glob(os.path.join(self.path, kind, '*.parquet'))
+        return sorted(int(os.path.splitext(os.path.basename(file))[0]) for file in files)
+
+    def split_columns(self, columns):
+        """ Split requested columns into static and time varying columns. None requests every column."""
+        if columns is None:
+            return None, None
+        static = [column for column in columns if column in self.static_columns]
+        varying = [column for column in columns if column not in self.static_columns]
+        return static, varying
+
+    def read_chunk(self, kind, year, columns=None, simulants=None):
+        filters = None if simulants is None else [('simulant', 'in', list(simulants))]
+        return pd.read_parquet(self.chunk_path(kind, year), columns=columns, filters=filters)
+
+    def read_static(self, simulants, columns=None):
+        """ Static columns of the given simulants."""
+        first_years = self.index.loc[simulants, 'first_year'].unique()
+        static = pd.concat([self.read_chunk('static', year, columns, simulants) for year in sorted(first_years)])
+        return static.reindex(simulants)
+
+    def year_slice(self, year, columns=None):
+        """ Rebuild the population of one year as a snapshot file would have held it.
+
+        Simulants who died in or before the year are included with their row from the year they died.
+
+        Parameters
+        ----------
+        year : int
+            Simulated year.
+        columns : list
+            Only read these columns. Reads all columns if None.
+
+        Returns
+        -------
+        pd.DataFrame
+            Population indexed by simulant.
+        """
+        static_columns, varying_columns = self.split_columns(columns)
+        frames = [self.read_chunk('years', year, varying_columns)]
+        frames += [self.read_chunk('exits', exit_year, varying_columns)
+                   for exit_year in self.years('exits') if exit_year <= year]
+        varying = pd.concat(frames)
+        if static_columns == []:
+            return varying
+        static = self.read_static(varying.index, static_columns)
+        pop = static.join(varying)
+        return pop if columns is None else pop[columns]
+
+    def trajectories(self, pidps, columns=None):
+        """ Every recorded year of the simulants with the given pidps.
+
+        Parameters
+        ----------
+        pidps : list
+            pidps to look up.
+        columns : list
+            Only read these columns. Reads all columns if None.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per simulant and year with simulant and year columns, sorted by pidp and year.
+        """
+        rows = self.index.loc[self.index['pidp'].isin(pidps)]
+        static_columns, varying_columns = self.split_columns(columns)
+        frames = []
+        for year in range(int(rows['first_year'].min()), int(rows['last_year'].max()) + 1):
+            simulants = rows.index[(rows['first_year'] <= year) & (rows['last_year'] >= year)]
+            if len(simulants) == 0:
+                continue
+            kinds = ['years'] + (['exits'] if (rows.loc[simulants, 'exit_year'] == year).any() else [])
+            for kind in kinds:
+                if os.path.exists(self.chunk_path(kind, year)):
+                    frame = self.read_chunk(kind, year, varying_columns, simulants)
+                    frames.append(frame.assign(year=year))
+        varying = pd.concat(frames) if frames else pd.DataFrame(columns=['year'])
+        # pidp is always read to sort trajectories by. Every static column is read if columns is None.
+        if static_columns is not None and 'pidp' not in static_columns:
+            static_columns = static_columns + ['pidp']
+        static = self.read_static(varying.index.unique(), static_columns)
+        trajectories = static.join(varying).reset_index().rename(columns={'index': 'simulant'})
+        return trajectories.sort_values(['pidp', 'year'], kind='stable').reset_index(drop=True)
+
+
+def find_panels(source, pattern='*'):
+    """ Panel stores in a directory of MINOS output.
+
+    Parameters
+    ----------
+    source : str
+        Output directory of a MINOS run. E.g. output/baseline/2022_01_01_12_00_00
+    pattern : str
+        Glob pattern for the start of the store name. E.g. run_id_1_ for a single batch run.
+
+    Returns
+    -------
+    list
+        Sorted panel store directories.
+    """
+    indexes = glob.glob(os.path.join(source, f"{pattern}panel", 'index.parquet'))
+    return sorted(os.path.dirname(index) for index in indexes)
@@ -13,6 +13,7 @@ import minos.utils as utilities
 
 from minos.RateTables.FertilityRateTable import FertilityRateTable
 from minos.modules.base_module import Base
+from minos.modules.population_index import population_index
 
 PREGNANCY_DURATION = pd.Timedelta(days=9 * utilities.DAYS_PER_MONTH)
 
@@ -45,15 +46,32 @@ class FertilityAgeSpecificRates(Base):
                 E.g. rate tables.
         """
         # produce rate table from minos file path in config and save it to the simulation.
+        asfr_fertility = FertilityAgeSpecificRates.load_rate_table(config)
+        simulation._data.write("covariate.age_specific_fertility_rate.estimate",
+                               asfr_fertility.rate_table)
+
+        return simulation
+
+    @staticmethod
+    def load_rate_table(config):
+        """ Build the fertility rate table, or read it from persistent_data if it was built before.
+
+        Parameters
+        ----------
+        config : vivarium.config_tree.ConfigTree
+            Config yaml tree for vivarium. path_to_fertility_file is added to it.
+
+        Returns
+        -------
+        FertilityRateTable
+            Handler holding the rate table.
+        """
         config.update({
             'path_to_fertility_file': "{}/{}".format(config.persistent_data_dir, config.fertility_file)
         }, source=str(Path(__file__).resolve()))
         asfr_fertility = FertilityRateTable(configuration=config)
         asfr_fertility.set_rate_table()
-        simulation._data.write("covariate.age_specific_fertility_rate.estimate",
-                               asfr_fertility.rate_table)
-
-        return simulation
+        return asfr_fertility
 
     def setup(self, builder):
         """ Initialise the module within the vivarium simulation.
@@ -141,7 +159,7 @@ class FertilityAgeSpecificRates(Base):
         # Currently people who are just added to the population arent in this index and wont be considered for births.
 
         nine_months_ago = pd.Timestamp(event.time - PREGNANCY_DURATION)
-        population = self.population_view.get(event.index, query='alive == "alive" and sex == "Female"')
+        population = self.get_alive(event.index, 'female')
         can_have_children = population.last_birth_time < nine_months_ago
         eligible_women = population[can_have_children]
         # calculate rates of having children and randomly draw births
@@ -169,19 +187,20 @@ class FertilityAgeSpecificRates(Base):
 
             # Get all new borns back from the population to add remaining information.
             # I changed it to this from VPH because its less messing around when adding new cohorts.
-            new_babies = self.population_view.get(self.new_babies_index,
-                                                  query='alive == "alive" and parent_id != -1')
+            new_babies = self.get_alive(self.new_babies_index, query='parent_id != -1')
 
             # Assign age, sex, ethnicity to newborns and update the population frame again.
             # Need to Assign other attributes too such as unemployment.
             # Better to be done in the other modules.
             if new_babies.shape[0] != 0:
-                new_babies['ethnicity'] = self.population_view.get(event.index).iloc[new_babies['parent_id']][
+                # Look parents up by simulant index. Positions in the view skip archived simulants.
+                new_babies['ethnicity'] = self.population_view.get(pd.Index(new_babies['parent_id']))[
                     'ethnicity'].values
                 new_babies['sex'] = self.randomness.choice(new_babies.index, ["Male", "Female"],
                                                            additional_key='sex_choice')
 
                 self.population_view.update(new_babies[['ethnicity', 'sex', 'age']])
+                population_index.record(new_babies[['sex']])
 
     @staticmethod
     def load_age_specific_fertility_rate_data(builder):
@@ -5,7 +5,6 @@ Possible extension to interaction with employment/education and any spatial/inte
 """
 
 import pandas as pd
-import minos.modules.r_utils as r_utils
 from minos.modules.base_module import Base
 import matplotlib.pyplot as plt
 from seaborn import histplot
@@ -44,7 +43,9 @@ class Alcohol(Base):
         #self.transition_coefficients = builder.
 
         # Assign randomness streams if necessary.
-        self.random = builder.randomness.get_stream(self.generate_random_crn_key())
+        self.random = builder.randomness.get_stream(self.name)
+
+        self.transition_utils = self.get_transition_utils(builder.configuration)
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
         # view_columns is the columns from the main population used in this module.
@@ -71,7 +72,7 @@ class Alcohol(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=3)
+        self.register_time_step(builder, priority=3, writes=["alcohol_spending"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -82,12 +83,12 @@ class Alcohol(Base):
             The event time_step that called this function.
         """
         # Get living people to update their alcohol
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         self.year = event.time.year
 
         ## Predict next alcohol value
         newWaveAlcohol = self.calculate_alcohol(pop)
-        newWaveAlcohol = pd.DataFrame(newWaveAlcohol, columns=["alcohol_spending"])
+        newWaveAlcohol = pd.DataFrame({"alcohol_spending": newWaveAlcohol}, index=pop.index)
         # Set index type to int (instead of object as previous)
         newWaveAlcohol.index = newWaveAlcohol.index.astype(int)
 
@@ -108,9 +109,9 @@ class Alcohol(Base):
         """
         # load transition model based on year.
         year = min(self.year, 2018)
-        transition_model = r_utils.load_transitions(f"alcohol/zip/alcohol_zip_{year}_{year + 1}")
-        # The calculation relies on the R predict method and the model that has already been specified
-        nextWaveAlcohol = r_utils.predict_next_timestep_alcohol_zip(transition_model, pop)
+        transition_model = self.transition_utils.load_transitions(f"alcohol/zip/alcohol_zip_{year}_{year + 1}")
+        # The calculation uses the predict method of the chosen backend and the model that has already been specified
+        nextWaveAlcohol = self.transition_utils.predict_next_timestep_alcohol_zip(transition_model, pop, self.random)
         return nextWaveAlcohol
 
     def plot(self, pop, config):
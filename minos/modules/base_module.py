@@ -7,8 +7,30 @@ easier to build.
 
 from datetime import datetime as dt
 
+import numpy as np
+
+from minos.modules.population_index import population_index
+from minos.modules.population_schema import schema, TypedView
+from minos.modules.scheduler import DeferredView
+
 class Base():
 
+    # Scheduler running this module's time step alongside others. Set by RunPipeline before setup.
+    # See minos.modules.scheduler.
+    scheduler = None
+
+    @property
+    def population_view(self):
+        return self._population_view
+
+    @population_view.setter
+    def population_view(self, view):
+        # Views from builder.population.get_view cast every update to the population schema.
+        # See minos.modules.population_schema.
+        if schema.enabled and not isinstance(view, (TypedView, DeferredView)):
+            view = TypedView(view)
+        self._population_view = view
+
     def pre_setup(self, config, simulation):
         """ Load in anything required for the module to run into the config and simulation object.
 
@@ -60,6 +82,129 @@ class Base():
         "Very unlikely to repeat but even then doesn't matter.."
         return f"{self.name}{dt.now()}"
 
+    def get_state(self):
+        """ State this module carries between time steps that a checkpoint needs to restore.
+
+        By default this is the key of the module's randomness stream. Random keys include the time the module was set
+        up so a resumed run must reuse the original key to draw the same numbers. Modules holding other state between
+        time steps (e.g. the current replenishment year) add it here.
+
+        Returns
+        -------
+        dict
+            Picklable state passed back to set_state when a checkpoint is restored.
+        """
+        state = {}
+        if hasattr(self, 'random'):
+            state['random_key'] = self.random.key
+        return state
+
+    def set_state(self, state):
+        """ Restore state returned by get_state after the simulation has been set up again.
+
+        Parameters
+        ----------
+        state : dict
+            State saved in a checkpoint.
+        """
+        if 'random_key' in state:
+            self.random.key = state['random_key']
+
+    def get_alive(self, index, *subsets, query=''):
+        """ Get the alive simulants of an index from the population view without a query string.
+
+        Alive simulants are looked up in the population index kept by Mortality and Replenishment. See
+        minos.modules.population_index.
+
+        Parameters
+        ----------
+        index : pd.Index
+            Simulants to select from. Usually event.index.
+        subsets : str
+            Other indexed subsets the simulants must be in. E.g. 'female'.
+        query : str
+            Any further conditions on the view's columns. E.g. "age == 17".
+
+        Returns
+        -------
+        pd.DataFrame
+            The view's columns for the selected simulants.
+        """
+        return self.population_view.get(population_index.select(index, 'alive', *subsets), query=query)
+
+    def get_transition_utils(self, config):
+        """ Get the utility module used to load and predict this module's transition models.
+
+        Native predictions from exported coefficients are used unless `transition_backend: "r"` is set in the config.
+        The chosen backend is imported here so R and rpy2 are only needed if they are actually used.
+
+        Parameters
+        ----------
+        config : vivarium.config_tree.ConfigTree
+            Config yaml tree for vivarium.
+
+        Returns
+        -------
+        module
+            minos.modules.native_utils or minos.modules.r_utils. Both provide load_transitions and predict functions.
+        """
+        backend = config.transition_backend if 'transition_backend' in config else 'native'
+        if backend == 'native':
+            from minos.modules import native_utils
+            return native_utils
+        elif backend == 'r':
+            from minos.modules import r_utils
+            return r_utils
+        raise ValueError(f"Unknown transition_backend '{backend}'. Use 'native' or 'r'.")
+
+    def register_time_step(self, builder, priority, writes):
+        """ Register on_time_step as a time step listener, or hand it to the scheduler if there is one.
+
+        Parameters
+        ----------
+        builder : vivarium.builder
+            Vivarium's control object passed to setup.
+        priority : int
+            Time step listener priority.
+        writes : list
+            Population columns on_time_step updates. Scheduled modules may only update these columns.
+        """
+        if self.scheduler is None:
+            builder.event.register_listener("time_step", self.on_time_step, priority=priority)
+        else:
+            # Time step queries filter on alive so it is read as well as the view's columns.
+            reads = list(self.population_view.columns) + ['alive']
+            self.scheduler.register(self, builder, priority, reads, writes)
+
+    def sample_categories(self, index, probabilities, additional_key=None):
+        """ Draw one category per simulant from a matrix of category probabilities.
+
+        Gives the same draws as self.random.choice(index, choices, probabilities) but works on the numpy matrix
+        directly and returns category positions rather than building a labelled pandas Series.
+
+        Parameters
+        ----------
+        index : pd.Index
+            Simulants to draw for. One per row of probabilities.
+        probabilities : np.ndarray or pd.DataFrame
+            (n, k) matrix of category probabilities. Rows are normalised to sum to 1.
+        additional_key : any
+            Passed to self.random.get_draw to vary draws for the same index and time.
+
+        Returns
+        -------
+        np.ndarray
+            Column position of the drawn category for each simulant. Use `+ 1` for 1 indexed ordinal states or index
+            an array of labels with it.
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        draws = self.random.get_draw(index, additional_key).to_numpy()
+        cumulative = np.cumsum(probabilities / probabilities.sum(axis=1, keepdims=True), axis=1)
+        # Each simulant takes the first category whose cumulative probability reaches their uniform draw.
+        codes = (draws[:, np.newaxis] > cumulative).sum(axis=1)
+        # Rounding can leave the final cumulative probability just under a draw. Keep those in the last category.
+        return np.minimum(codes, probabilities.shape[1] - 1)
+
     def plot(self, pop_data, config):
         """ Default plot method for modules. Does nothing.
 
@@ -0,0 +1,128 @@
+"""
+Shared loader for the prepared input cohorts (e.g. data/final_US/2018_US_cohort.csv).
+
+The starting cohort was read in several places: scripts/run.py parsed the whole file just to count its rows for
+population_size, then Replenishment or replenishmentNowcast read it again from a hard coded path. Every read now goes
+through load_cohort so the file is parsed once per process (see minos.modules.input_cache).
+
+generate_stock_pop also writes a small metadata sidecar next to each cohort (2018_US_cohort.csv.meta.json) with its row
+count, column types and a sha256 of the file. cohort_size reads the row count from the sidecar without parsing the
+csv. The sidecar is ignored if the csv's size or modification time no longer match it, e.g. a cohort edited by hand,
+and the cohort is loaded instead.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from minos.modules import input_cache
+
+# Prepared cohorts used if the config has no input_data_dir.
+INPUT_DATA_DIR = "data/final_US"
+
+
+def cohort_path(input_data_dir, year):
+    """ Path of the prepared cohort of a year."""
+    return os.path.join(input_data_dir, f"{year}_US_cohort.csv")
+
+
+def metadata_path(path):
+    return path + ".meta.json"
+
+
+def file_hash(path):
+    """ sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_metadata(path, data):
+    """ Write the metadata sidecar of a cohort csv that has just been saved.
+
+    Parameters
+    ----------
+    path : str
+        Cohort csv.
+    data : pd.DataFrame
+        The cohort as saved to path.
+    """
+    stat = os.stat(path)
+    metadata = {'rows': int(data.shape[0]),
+                'columns': {str(name): str(dtype) for name, dtype in data.dtypes.items()},
+                'sha256': file_hash(path),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime}
+    # Written under a temporary name and moved into place so a partial sidecar is never read.
+    with open(metadata_path(path) + '.tmp', 'w') as file:
+        json.dump(metadata, file, indent=2)
+    os.replace(metadata_path(path) + '.tmp', metadata_path(path))
+
+
+def read_metadata(path):
+    """ Metadata sidecar of a cohort csv.
+
+    Parameters
+    ----------
+    path : str
+        Cohort csv.
+
+    Returns
+    -------
+    dict
+        The metadata. None if there is no sidecar or the csv has changed since it was written.
+    """
+    try:
+        with open(metadata_path(path)) as file:
+            metadata = json.load(file)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if metadata.get('size') != stat.st_size or metadata.get('mtime') != stat.st_mtime:
+        logging.info(f"Ignoring out of date metadata for {path}.")
+        return None
+    return metadata
+
+
+def load_cohort(input_data_dir, year, copy=True):
+    """ Load the prepared cohort of a year through the input cache.
+
+    Parameters
+    ----------
+    input_data_dir : str
+        Directory of prepared cohorts. input_data_dir in the config.
+    year : int
+        Cohort year.
+    copy : bool
+        Return a copy the caller may modify. Only pass False if the cohort is not modified.
+
+    Returns
+    -------
+    pd.DataFrame
+        The cohort.
+    """
+    return input_cache.read_csv(cohort_path(input_data_dir, year), copy=copy)
+
+
+def cohort_size(input_data_dir, year):
+    """ Number of simulants in the prepared cohort of a year. Read from its sidecar if it is up to date.
+
+    Parameters
+    ----------
+    input_data_dir : str
+        Directory of prepared cohorts.
+    year : int
+        Cohort year.
+
+    Returns
+    -------
+    int
+        Number of rows in the cohort.
+    """
+    metadata = read_metadata(cohort_path(input_data_dir, year))
+    if metadata is not None:
+        return metadata['rows']
+    return load_cohort(input_data_dir, year, copy=False).shape[0]
@@ -6,7 +6,6 @@ Possible future work for moving households and changing household composition (e
 
 import pandas as pd
 from pathlib import Path
-from minos.modules import r_utils
 from minos.modules.base_module import Base
 import matplotlib.pyplot as plt
 from seaborn import catplot
@@ -49,6 +48,8 @@ class Housing(Base):
         # Assign randomness streams if necessary. Only useful if seeding counterfactuals.
         self.random = builder.randomness.get_stream(self.generate_random_crn_key())
 
+        self.transition_utils = self.get_transition_utils(builder.configuration)
+
 
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
@@ -71,7 +72,7 @@ class Housing(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=3)
+        self.register_time_step(builder, priority=3, writes=["housing_quality"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -85,15 +86,14 @@ class Housing(Base):
         # Draw individuals next states randomly from this distribution.
         # Adjust other variables according to changes in state. E.g. a birth would increase child counter by one.
 
-        pop = self.population_view.get(event.index, query="alive=='alive'")
+        pop = self.get_alive(event.index)
         self.year = event.time.year
 
         housing_prob_df = self.calculate_housing(pop)
 
-        housing_prob_df["housing_quality"] = self.random.choice(housing_prob_df.index, list(housing_prob_df.columns), housing_prob_df)+1
-        housing_prob_df.index = housing_prob_df.index.astype(int)
+        housing_quality = self.sample_categories(pop.index, housing_prob_df) + 1
 
-        self.population_view.update(housing_prob_df["housing_quality"])
+        self.population_view.update(pd.Series(housing_quality, index=pop.index, name="housing_quality"))
 
     def calculate_housing(self, pop):
         """Calculate housing transition distribution based on provided people/indices.
@@ -107,9 +107,9 @@ class Housing(Base):
         """
         # load transition model based on year.
         year = min(self.year, 2018)
-        transition_model = r_utils.load_transitions(f"housing/clm/housing_clm_{year}_{year+1}")
+        transition_model = self.transition_utils.load_transitions(f"housing/clm/housing_clm_{year}_{year+1}")
         # returns probability matrix (3xn) of next ordinal state.
-        prob_df = r_utils.predict_next_timestep_clm(transition_model, pop)
+        prob_df = self.transition_utils.predict_next_timestep_clm(transition_model, pop)
         return prob_df
 
     def plot(self, pop, config):
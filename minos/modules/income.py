@@ -5,7 +5,6 @@ Possible extension to interaction with employment/education and any spatial/inte
 """
 
 import pandas as pd
-import minos.modules.r_utils as r_utils
 from minos.modules.base_module import Base
 import matplotlib.pyplot as plt
 from seaborn import histplot
@@ -47,6 +46,8 @@ class Income(Base):
         # Assign randomness streams if necessary.
         self.random = builder.randomness.get_stream(self.generate_random_crn_key())
 
+        self.transition_utils = self.get_transition_utils(builder.configuration)
+
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
         # view_columns is the columns from the main population used in this module.
@@ -73,7 +74,7 @@ class Income(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=2)
+        self.register_time_step(builder, priority=2, writes=["hh_income"])
 
     def on_time_step(self, event):
         """ Predicts the hh_income for the next timestep.
@@ -84,7 +85,7 @@ class Income(Base):
             The event time_step that called this function.
         """
         # Get living people to update their income
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         self.year = event.time.year
 
         ## Predict next income value
@@ -112,9 +113,9 @@ class Income(Base):
         """
         # load transition model based on year.
         year = min(self.year, 2018)
-        transition_model = r_utils.load_transitions(f"hh_income/hh_income_{year}_{year + 1}")
-        # The calculation relies on the R predict method and the model that has already been specified
-        nextWaveIncome = r_utils.predict_next_timestep_ols(transition_model, pop, independant='hh_income')
+        transition_model = self.transition_utils.load_transitions(f"hh_income/hh_income_{year}_{year + 1}")
+        # The calculation uses the predict method of the chosen backend and the model that has already been specified
+        nextWaveIncome = self.transition_utils.predict_next_timestep_ols(transition_model, pop, independant='hh_income')
         return nextWaveIncome
 
     def plot(self, pop, config):
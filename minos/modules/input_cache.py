@@ -0,0 +1,35 @@
+"""
+Process-wide cache of read-only input tables.
+
+The starting cohort and rate tables are read by every run. Reading them through this cache means each file is parsed
+once per process. scripts/run.py fills the cache before forking replicate workers so every replicate shares the
+parent's parsed copy (copy-on-write) instead of parsing the files again.
+"""
+
+import pandas as pd
+
+from minos.modules.model_cache import ModelCache
+
+# Tables keyed by resolved path and modification time like transition models.
+input_tables = ModelCache(maxsize=16)
+
+
+def read_csv(filename, copy=True, **kwargs):
+    """ Read a csv file through the input cache.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the csv file.
+    copy : bool
+        Return a copy the caller may modify. Only pass False if the table is not modified.
+    kwargs
+        Passed to pd.read_csv when the file is first read. A file must always be read with the same arguments.
+
+    Returns
+    -------
+    pd.DataFrame
+        The table.
+    """
+    table = input_tables.get(filename, lambda resolved: pd.read_csv(resolved, **kwargs))
+    return table.copy() if copy else table
@@ -7,7 +7,7 @@ import numpy as np
 from pathlib import Path
 from minos.modules.base_module import Base
 
-class hhIncomeIntervention():
+class hhIncomeIntervention(Base):
 
     @property
     def name(self):
@@ -101,7 +101,7 @@ class hhIncomeIntervention():
 
     def on_time_step(self, event):
 
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         # TODO probably a faster way to do this than resetting the whole column.
         pop['hh_income'] -= (self.uplift * pop["income_boosted"])  # reset boost if people move out of bottom decile.
         # pop['income_deciles'] = pd.qcut(pop["hh_income"], int(100/self.prop), labels=False)
@@ -169,7 +169,7 @@ class hhIncomeChildUplift(Base):
         self.population_view.update(pop_update)
 
     def on_time_step(self, event):
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         # print(np.mean(pop['hh_income'])) # for debugging purposes.
         # TODO probably a faster way to do this than resetting the whole column.
         pop['hh_income'] -= pop['boost_amount']  # reset boost if people move out of bottom decile.
@@ -235,7 +235,7 @@ class hhIncomePovertyLineChildUplift(Base):
         self.population_view.update(pop_update)
 
     def on_time_step(self, event):
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         # TODO probably a faster way to do this than resetting the whole column.
         pop['hh_income'] -= pop['boost_amount']
         # Poverty is defined as having (equivalised) disposable hh income <= 60% of national median.
@@ -319,7 +319,7 @@ class livingWageIntervention(Base):
         Returns
         -------
         """
-        pop = self.population_view.get(event.index, query="alive =='alive' and job_sector == 2")
+        pop = self.get_alive(event.index, query="job_sector == 2")
         # TODO probably a faster way to do this than resetting the whole column.
         pop['hh_income'] -= pop['boost_amount']
         # Now get who gets uplift (different for London/notLondon)
@@ -397,7 +397,7 @@ class energyDownlift(Base):
 
 
     def on_time_step(self, event):
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         # TODO probably a faster way to do this than resetting the whole column.
         pop['hh_income'] -= pop['boost_amount']
         # Poverty is defined as having (equivalised) disposable hh income <= 60% of national median.
@@ -6,7 +6,6 @@ Possible future work for moving households and changing household composition (e
 
 import pandas as pd
 from pathlib import Path
-from minos.modules import r_utils
 import random
 from minos.modules.base_module import Base
 import matplotlib.pyplot as plt
@@ -51,6 +50,8 @@ class Labour(Base):
         # random CRN seed for every run.
         self.random = builder.randomness.get_stream(self.generate_random_crn_key())
 
+        self.transition_utils = self.get_transition_utils(builder.configuration)
+
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
         # view_columns is the columns from the main population used in this module. essentially what is needed for
@@ -74,7 +75,7 @@ class Labour(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=3)
+        self.register_time_step(builder, priority=3, writes=["labour_state"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -92,15 +93,14 @@ class Labour(Base):
         # Separate the population into current students and everyone else. Then see if students max_educ is larger than
         # current education_state, if yes maintain student, if no predict new labour_state
 
-        pop = self.population_view.get(event.index, query="alive=='alive'")
+        pop = self.get_alive(event.index)
         self.year = event.time.year
 
         labour_prob_df = self.calculate_labour(pop)
 
-        labour_prob_df["labour_state"] = self.random.choice(labour_prob_df.index, list(labour_prob_df.columns), labour_prob_df)
-        labour_prob_df.index = labour_prob_df.index.astype(int)
+        labour_states = labour_prob_df.columns.to_numpy()[self.sample_categories(pop.index, labour_prob_df)]
 
-        self.population_view.update(labour_prob_df["labour_state"])
+        self.population_view.update(pd.Series(labour_states, index=pop.index, name="labour_state"))
 
 
     def calculate_labour(self, pop):
@@ -115,9 +115,9 @@ class Labour(Base):
         """
         # load transition model based on year.
         year = min(self.year, 2018) # TODO just use latest model for now. Needs some kind of reweighting if extrapolating later.
-        transition_model = r_utils.load_transitions(f"data/transitions/labour/nnet/labour_nnet_{year}_{year+1}", "")
+        transition_model = self.transition_utils.load_transitions(f"data/transitions/labour/nnet/labour_nnet_{year}_{year+1}", "")
         # returns probability matrix (9xn) of next ordinal state.
-        prob_df = r_utils.predict_next_timestep_labour_nnet(transition_model, pop)
+        prob_df = self.transition_utils.predict_next_timestep_labour_nnet(transition_model, pop)
         return prob_df
 
     def plot(self, pop, config):
@@ -2,7 +2,6 @@
 
 import pandas as pd
 from pathlib import Path
-from minos.modules import r_utils
 from minos.modules.base_module import Base
 import matplotlib.pyplot as plt
 from seaborn import catplot
@@ -42,6 +41,8 @@ class Loneliness(Base):
 
         # Assign randomness streams if necessary.
         self.random = builder.randomness.get_stream(self.generate_random_crn_key())
+
+        self.transition_utils = self.get_transition_utils(builder.configuration)
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
         # view_columns is the columns from the main population used in this module. essentially what is needed for
@@ -66,7 +67,7 @@ class Loneliness(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=2)
+        self.register_time_step(builder, priority=2, writes=["loneliness"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -80,17 +81,14 @@ class Loneliness(Base):
         # Draw individuals next states randomly from this distribution.
         # Adjust other variables according to changes in state. E.g. a birth would increase child counter by one.
 
-        pop = self.population_view.get(event.index, query="alive=='alive'")
+        pop = self.get_alive(event.index)
         self.year = event.time.year
 
         loneliness_prob_df = self.calculate_loneliness(pop)
 
-        loneliness_prob_df["loneliness"] = self.random.choice(loneliness_prob_df.index,
-                                                              list(loneliness_prob_df.columns),
-                                                              loneliness_prob_df) + 1
-        loneliness_prob_df.index = loneliness_prob_df.index.astype(int)
+        loneliness = self.sample_categories(pop.index, loneliness_prob_df) + 1
 
-        self.population_view.update(loneliness_prob_df["loneliness"])
+        self.population_view.update(pd.Series(loneliness, index=pop.index, name="loneliness"))
 
     def calculate_loneliness(self, pop):
         """Calculate loneliness transition distribution based on provided people/indices.
@@ -108,9 +106,9 @@ class Loneliness(Base):
         else:
             year = self.year
         year = min(year, 2018)
-        transition_model = r_utils.load_transitions(f"loneliness/clm/loneliness_clm_{year}_{year + 1}")
+        transition_model = self.transition_utils.load_transitions(f"loneliness/clm/loneliness_clm_{year}_{year + 1}")
         # returns probability matrix (3xn) of next ordinal state.
-        prob_df = r_utils.predict_next_timestep_clm(transition_model, pop)
+        prob_df = self.transition_utils.predict_next_timestep_clm(transition_model, pop)
         return prob_df
 
     def plot(self, pop, config):
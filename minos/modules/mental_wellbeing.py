@@ -6,7 +6,6 @@ Possible extension to interaction with employment/education and any spatial/inte
 
 import pandas as pd
 from pathlib import Path
-import minos.modules.r_utils as r_utils
 from minos.modules.base_module import Base
 from seaborn import histplot
 import matplotlib.pyplot as plt
@@ -48,6 +47,8 @@ class MWB(Base):
         # Assign randomness streams if necessary.
         self.random = builder.randomness.get_stream(self.generate_random_crn_key())
 
+        self.transition_utils = self.get_transition_utils(builder.configuration)
+
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
         # view_columns is the columns from the main population used in this module.
@@ -72,7 +73,7 @@ class MWB(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=3)
+        self.register_time_step(builder, priority=3, writes=["SF_12"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -86,7 +87,7 @@ class MWB(Base):
         self.year = event.time.year
 
         # Get living people to update their income
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
 
         ## Predict next income value
         newWaveMWB = self.calculate_mwb(pop)
@@ -110,8 +111,8 @@ class MWB(Base):
         -------
         """
         year = min(self.year, 2018)
-        transition_model = r_utils.load_transitions(f"mwb/ols/sf12_ols_{year}_{year+1}")
-        return r_utils.predict_next_timestep_ols(transition_model, pop, 'SF_12')
+        transition_model = self.transition_utils.load_transitions(f"mwb/ols/sf12_ols_{year}_{year+1}")
+        return self.transition_utils.predict_next_timestep_ols(transition_model, pop, 'SF_12')
 
     def plot(self, pop, config):
 
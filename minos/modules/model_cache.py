@@ -0,0 +1,92 @@
+"""
+Process-wide cache for fitted transition models.
+
+Every module loads its transition model on every time step. Because years past the last fitted model are clamped
+(e.g. min(year, 2018)) most of those loads are for a file that has already been read. Models are kept here keyed by
+their resolved path and file modification time so a rewritten model file is always reloaded.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class ModelCache:
+    """Least recently used cache of loaded transition models with hit/miss counters."""
+
+    def __init__(self, maxsize=32):
+        """
+        Parameters
+        ----------
+        maxsize : int
+            Maximum number of models held before the least recently used model is evicted.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._models = OrderedDict()
+        # Modules may load models from several threads at once. See minos.modules.scheduler.
+        self._lock = threading.RLock()
+
+    def get(self, filename, loader):
+        """ Get a model from the cache, loading it with loader if it is not present or its file has changed.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the model file.
+        loader : callable
+            Function taking the resolved file name and returning the loaded model.
+
+        Returns
+        -------
+        The loaded model.
+        """
+        resolved = os.path.realpath(filename)
+        key = (resolved, os.stat(resolved).st_mtime_ns)
+
+        with self._lock:
+            if key in self._models:
+                self.hits += 1
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            self.misses += 1
+            model = loader(resolved)
+            # Drop any stale copy of the same file loaded before it was rewritten.
+            for stale_key in [k for k in self._models if k[0] == resolved]:
+                del self._models[stale_key]
+            self._models[key] = model
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+            return model
+
+    def clear(self):
+        """Remove all models from the cache and reset the counters."""
+        with self._lock:
+            self._models.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """ Summary of cache usage.
+
+        Returns
+        -------
+        dict
+            Number of hits, misses and models currently held.
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._models),
+                'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._models)
+
+    def __repr__(self):
+        return f"ModelCache(hits={self.hits}, misses={self.misses}, size={len(self._models)}, maxsize={self.maxsize})"
+
+
+# Single registry shared by every module in the process.
+transition_models = ModelCache()
@@ -14,6 +14,7 @@ import random
 from vivarium.framework.utilities import rate_to_probability
 from minos.RateTables.MortalityRateTable import MortalityRateTable
 from minos.modules.base_module import Base
+from minos.modules.population_index import population_index
 
 class Mortality(Base):
 
@@ -36,20 +37,36 @@ class Mortality(Base):
                 The initiated vivarium simulation object with anything needed to run the module.
                 E.g. rate tables.
         """
-        # Define path to mortality rate data.
-        config.update({
-            'path_to_mortality_file': f"{config.persistent_data_dir}/{config.mortality_file}"
-        }, source=str(Path(__file__).resolve()))
-
         # Load in mortality rate table data and append it to the simulation object.
-        asfr_mortality = MortalityRateTable(configuration=config)
-        asfr_mortality.set_rate_table()
+        asfr_mortality = self.load_rate_table(config)
 
         simulation._data.write("cause.all_causes.cause_specific_mortality_rate",
                                asfr_mortality.rate_table)
         return simulation
 
 
+    @staticmethod
+    def load_rate_table(config):
+        """ Build the mortality rate table, or read it from persistent_data if it was built before.
+
+        Parameters
+        ----------
+        config : vivarium.config_tree.ConfigTree
+            Config yaml tree for vivarium. path_to_mortality_file is added to it.
+
+        Returns
+        -------
+        MortalityRateTable
+            Handler holding the rate table.
+        """
+        # Define path to mortality rate data.
+        config.update({
+            'path_to_mortality_file': f"{config.persistent_data_dir}/{config.mortality_file}"
+        }, source=str(Path(__file__).resolve()))
+        asfr_mortality = MortalityRateTable(configuration=config)
+        asfr_mortality.set_rate_table()
+        return asfr_mortality
+
     def setup(self, builder):
         """ Initialise the module during simulation.setup().
 
@@ -120,6 +137,7 @@ class Mortality(Base):
                                    'exit_time': pd.NaT},
                                   index=pop_data.index)
         self.population_view.update(pop_update)
+        population_index.record(pop_update)
 
 
     def on_time_step(self, event):
@@ -131,7 +149,7 @@ class Mortality(Base):
             The event time_step that called this function.
         """
         # Get everyone who is alive and calculate their rate of death.
-        pop = self.population_view.get(event.index, query="alive =='alive' and sex != 'nan'")
+        pop = self.get_alive(event.index, query="sex != 'nan'")
         # Convert these rates to probabilities of death or not death.
         prob_df = rate_to_probability(pd.DataFrame(self.mortality_rate(pop.index)))
         prob_df['no_death'] = 1 - prob_df.sum(axis=1)
@@ -140,17 +158,21 @@ class Mortality(Base):
         # If they draw 0.3 then they live.
         # The "cause_of_death" notation allows for more descriptive deaths.
         # Useful later when dying naturally vs due to mental health issues.
-        prob_df['cause_of_death'] = self.random.choice(prob_df.index, list(prob_df.columns), prob_df)
-        # prob_df['cause_of_death'] = self.random.choice(prob_df.index, prob_df.columns, prob_df)
-        dead_pop = prob_df.query('cause_of_death != "no_death"').copy()
+        causes = prob_df.columns.to_numpy()
+        cause_of_death = causes[self.sample_categories(prob_df.index, prob_df)]
+        died = cause_of_death != "no_death"
 
-        if not dead_pop.empty:
+        if died.any():
             # If anyone dies, kill them.
             # Update their alive status, exit time, and expected life lost to the main population frame.
-            dead_pop['alive'] = pd.Series('dead', index=dead_pop.index)
-            dead_pop['exit_time'] = event.time
-            dead_pop['years_of_life_lost'] = self.life_expectancy(dead_pop.index) - pop.loc[dead_pop.index]['age']
+            dead_index = prob_df.index[died]
+            dead_pop = pd.DataFrame({'alive': 'dead',
+                                     'exit_time': event.time,
+                                     'cause_of_death': cause_of_death[died]},
+                                    index=dead_index)
+            dead_pop['years_of_life_lost'] = self.life_expectancy(dead_index) - pop.loc[dead_index, 'age']
             self.population_view.update(dead_pop[['alive', 'exit_time', 'cause_of_death', 'years_of_life_lost']])
+            population_index.record(dead_pop)
 
 
     def calculate_mortality_rate(self, index):
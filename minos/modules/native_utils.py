@@ -0,0 +1,445 @@
+"""
+Native (NumPy) utility functions for transition models.
+
+These mirror the prediction functions in r_utils, but evaluate the fitted R models from the coefficients exported by
+minos/transitions/export_transitions.R. No R session or rpy2 conversion of the population is needed.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+from minos.modules import transition_artifacts
+from minos.modules.model_cache import transition_models
+from minos.modules.unique_profiles import by_profile
+
+
+def load_transitions(component, path='data/transitions/'):
+    """
+    This function will load transition models that have been exported from R.
+
+    Compiled artifacts (<component>.manifest.json and .npy, see transition_artifacts) are used if present, otherwise
+    the exported <component>.json.
+
+    Parameters
+    ----------
+    path : String
+        Path to transitions folder
+    component : String
+        Component to load transition for, as string
+
+    Returns:
+    -------
+    dict
+        Model specification with numpy coefficient arrays, ready for prediction.
+    """
+    manifest = f"{path}{component}{transition_artifacts.MANIFEST_SUFFIX}"
+    if os.path.exists(manifest):
+        return transition_models.get(manifest, transition_artifacts.read_compiled_model)
+
+    filename = f"{path}{component}.json"
+    try:
+        model = transition_models.get(filename, read_model_spec)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No exported transition model at {filename}. Run `make native_transitions` to "
+                                f"export it from the fitted R model, or set transition_backend: 'r' in the config.")
+    return model
+
+
+def preload_transitions(path='data/transitions/'):
+    """ Load every exported transition model under path into the model cache.
+
+    Used before forking replicate runs so every replicate shares the loaded models. The cache is enlarged to hold
+    all of them.
+
+    Parameters
+    ----------
+    path : str
+        Path to transitions folder
+
+    Returns
+    -------
+    int
+        Number of models loaded.
+    """
+    path = os.path.join(path, '')
+    components = set()
+    for filename in glob.glob(os.path.join(path, '**', '*.json'), recursive=True):
+        component = os.path.relpath(filename, path)
+        suffix = transition_artifacts.MANIFEST_SUFFIX if component.endswith(transition_artifacts.MANIFEST_SUFFIX) \
+            else ".json"
+        components.add(component[:-len(suffix)])
+    transition_models.maxsize = max(transition_models.maxsize, len(components))
+    for component in sorted(components):
+        load_transitions(component, path)
+    return len(components)
+
+
+def read_model_spec(filename):
+    """ Read an exported model specification and convert its coefficients to numpy arrays.
+
+    Parameters
+    ----------
+    filename : str
+        Path to exported .json model.
+
+    Returns
+    -------
+    dict
+        Model specification.
+    """
+    with open(filename) as spec_file:
+        spec = json.load(spec_file)
+    if 'levels' in spec:
+        spec['levels'] = [str(level) for level in spec['levels']]
+    if 'thresholds' in spec:
+        spec['thresholds'] = np.atleast_1d(np.asarray(spec['thresholds'], dtype=float))
+
+    # Zero inflated models have separate count and zero linear predictors. Everything else has one.
+    if spec['family'] == 'zeroinfl':
+        predictors = [spec['count'], spec['zero']]
+    else:
+        predictors = [spec]
+    for predictor in predictors:
+        predictor['intercept'] = np.atleast_1d(np.asarray(predictor['intercept'], dtype=float))
+        for term in predictor['terms']:
+            term['coefficients'] = np.atleast_2d(np.asarray(term['coefficients'], dtype=float))
+            if term['type'] == 'factor':
+                term['levels'] = [str(level) for level in term['levels']]
+    return spec
+
+
+def r_level(value):
+    """ String R would use for value as a factor level. E.g. 2.0 -> '2', 'Male' -> 'Male'."""
+    if isinstance(value, (bool, np.bool_)):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (float, np.floating)):
+        if float(value).is_integer():
+            return str(int(value))
+        return f"{value:.15g}"
+    return str(value)
+
+
+def level_codes(values, levels):
+    """ Position of each value within a list of R factor levels.
+
+    Values are factorised first so only the unique values are converted to level strings.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Population column.
+    levels : list
+        Factor levels from the fitted model.
+
+    Returns
+    -------
+    np.ndarray
+        Integer level positions. Missing values are -1.
+
+    Raises
+    ------
+    ValueError
+        If values contain a level the model was not fitted with (R's predict errors in the same case).
+    """
+    codes, uniques = pd.factorize(values)
+    positions = {level: i for i, level in enumerate(levels)}
+    lookup = np.empty(len(uniques), dtype=np.intp)
+    new_levels = []
+    for i, unique in enumerate(uniques):
+        level = r_level(unique)
+        if level not in positions:
+            new_levels.append(level)
+        else:
+            lookup[i] = positions[level]
+    if new_levels:
+        raise ValueError(f"Column {values.name} has levels {new_levels} not seen when fitting the model.")
+
+    result = np.full(len(codes), -1, dtype=np.intp)
+    known = codes >= 0
+    result[known] = lookup[codes[known]]
+    return result
+
+
+def term_matrix(term, current):
+    """ Contribution of one formula term to the linear predictor(s).
+
+    Parameters
+    ----------
+    term : dict
+        Exported term specification.
+    current : pd.DataFrame
+        Population to predict for.
+
+    Returns
+    -------
+    np.ndarray
+        (n, m) array for n simulants and m linear predictor outputs. NaN where the covariate is missing.
+    """
+    values = current[term['column']]
+    coefficients = term['coefficients']
+    if term['type'] == 'factor':
+        codes = level_codes(values, term['levels'])
+        contribution = coefficients[codes]
+        contribution[codes < 0] = np.nan
+        return contribution
+
+    x = values.to_numpy(dtype=float)
+    if term['transform'] == 'scale':
+        # scale() arguments that were not fixed at fit time are recomputed from the new data as R would.
+        center = term['center'] if term['center'] is not None else np.nanmean(x)
+        scale = term['scale'] if term['scale'] is not None else np.nanstd(x - center, ddof=1)
+        x = (x - center) / scale
+    return x[:, np.newaxis] * coefficients
+
+
+def linear_predictor(spec, current):
+    """ Evaluate intercept plus the sum of term contributions for an exported linear predictor.
+
+    Parameters
+    ----------
+    spec : dict
+        Exported model or linear predictor specification with intercept and terms.
+    current : pd.DataFrame
+        Population to predict for.
+
+    Returns
+    -------
+    np.ndarray
+        (n, m) array of linear predictor values.
+    """
+    eta = np.tile(spec['intercept'], (current.shape[0], 1))
+    for term in spec['terms']:
+        eta += term_matrix(term, current)
+    return eta
+
+
+def profile_columns(model, current):
+    """ Population columns an exported model uses, for predicting once per unique profile. See unique_profiles.
+
+    Returns None if a term is scaled by the mean or standard deviation of the data being predicted for, as
+    predictions for one row then depend on every other row.
+    """
+    predictors = [model['count'], model['zero']] if model['family'] == 'zeroinfl' else [model]
+    terms = [term for predictor in predictors for term in predictor['terms']]
+    if any(term['type'] == 'numeric' and term['transform'] == 'scale' and
+           (term['center'] is None or term['scale'] is None) for term in terms):
+        return None
+    return list(dict.fromkeys(term['column'] for term in terms))
+
+
+@by_profile(profile_columns)
+def predict_next_timestep_ols(model, current, independant):
+    """
+    This function will take the transition model loaded in load_transitions() and use it to predict the next timestep
+    for a module.
+
+    Equivalent to R's predict.lm. The design matrix is built from the exported terms and multiplied by the
+    coefficients without converting the population to R.
+
+    Parameters
+    ----------
+    model : dict
+        Exported OLS model loaded in from .json file
+    current : pd.DataFrame
+        View including columns that are required for prediction
+    independant : str
+        Name of the predicted column.
+
+    Returns:
+    -------
+    A prediction of the information for next timestep
+    """
+    prediction = linear_predictor(model, current)[:, 0]
+    return pd.DataFrame({independant: prediction}, index=current.index)
+
+
+# Inverse link functions. Names match ordinal::clm and the binomial links used by pscl::zeroinfl.
+inverse_links = {
+    'logit': special.expit,
+    'probit': special.ndtr,
+    'cloglog': lambda x: -np.expm1(-np.exp(x)),
+    'loglog': lambda x: np.exp(-np.exp(-x)),
+    'cauchit': lambda x: 0.5 + np.arctan(x) / np.pi,
+    'log': np.exp,
+}
+
+
+@by_profile(profile_columns)
+def predict_next_timestep_clm(model, current):
+    """
+    This function will take the transition model loaded in load_transitions() and use it to predict the next timestep
+    for a module.
+
+    Equivalent to R's predict.clm with type="prob". For thresholds theta_j and linear predictor eta the cumulative
+    probabilities are P(Y <= j) = F(theta_j - eta) for inverse link F. Probabilities of each state are the
+    differences between consecutive cumulative probabilities.
+
+    Parameters
+    ----------
+    model : dict
+        Exported clm model loaded in from .json file
+    current : pd.DataFrame
+        View including columns that are required for prediction
+
+    Returns:
+    -------
+    pd.DataFrame
+        (n, k) matrix of probabilities of each of the k ordinal states. Columns are 0 to k-1 like r_utils.
+    """
+    if model['link'] not in inverse_links:
+        raise ValueError(f"Unsupported clm link function {model['link']}.")
+    eta = linear_predictor(model, current)
+    cumulative = inverse_links[model['link']](model['thresholds'][np.newaxis, :] - eta)
+    n = cumulative.shape[0]
+    cumulative = np.hstack([np.zeros((n, 1)), cumulative, np.ones((n, 1))])
+    probabilities = np.diff(cumulative, axis=1)
+    # Propagate missing covariates to every state as R does, not just to the interior thresholds.
+    probabilities[np.isnan(eta[:, 0])] = np.nan
+    return pd.DataFrame(probabilities, index=current.index)
+
+
+@by_profile(profile_columns)
+def predict_next_timestep_multinom(model, current):
+    """ Class probabilities from an exported nnet::multinom model.
+
+    Equivalent to R's predict.multinom with type="probs". The first class is the baseline with a linear predictor of 0
+    and probabilities are the softmax over all classes.
+
+    Parameters
+    ----------
+    model : dict
+        Exported multinom model loaded in from .json file
+    current : pd.DataFrame
+        View including columns that are required for prediction
+
+    Returns
+    -------
+    pd.DataFrame
+        (n, k) matrix of class probabilities. Columns are the class levels of the fitted model.
+    """
+    eta = linear_predictor(model, current)
+    eta = np.hstack([np.zeros((eta.shape[0], 1)), eta])
+    # Subtract the row maximum before exponentiating so large linear predictors do not overflow.
+    eta -= np.max(eta, axis=1, keepdims=True)
+    probabilities = np.exp(eta)
+    probabilities /= np.sum(probabilities, axis=1, keepdims=True)
+    return pd.DataFrame(probabilities, index=current.index, columns=model['levels'])
+
+
+def predict_next_timestep_labour_nnet(model, current):
+    """Function for predicting next state using labour nnet models. See predict_next_timestep_multinom."""
+    return predict_next_timestep_multinom(model, current)
+
+
+def predict_highest_educ_nnet(model, current):
+    """Function for predicting highest level of education for the future replenishing populations using nnet model.
+    See predict_next_timestep_multinom."""
+    return predict_next_timestep_multinom(model, current)
+
+
+@by_profile(profile_columns)
+def predict_zip_parts(model, current):
+    """ Count means and structural zero probabilities from an exported pscl::zeroinfl model.
+
+    Equivalent to R's predict.zeroinfl with type="count" and type="zero", evaluated in one pass.
+
+    Parameters
+    ----------
+    model : dict
+        Exported zeroinfl model loaded in from .json file
+    current : pd.DataFrame
+        View including columns that are required for prediction
+
+    Returns
+    -------
+    tuple
+        Numpy arrays of count means and zero probabilities for each row of current.
+    """
+    if model['link'] not in inverse_links:
+        raise ValueError(f"Unsupported zeroinfl link function {model['link']}.")
+    counts = np.exp(linear_predictor(model['count'], current)[:, 0])
+    zeros = inverse_links[model['link']](linear_predictor(model['zero'], current)[:, 0])
+    return counts, zeros
+
+
+def draw_zip(counts, zeros, index, random=None):
+    """ Draw next counts from zero inflated Poisson predictions. Used by both the native and R backends.
+
+    A simulant is a structural zero with probability zeros. Otherwise their count is drawn from a Poisson distribution
+    with mean counts, by inverting the Poisson CDF at a second draw so it also comes from the module's stream.
+
+    Parameters
+    ----------
+    counts, zeros : np.ndarray
+        Count means and zero probabilities from predict_zip_parts.
+    index : pd.Index
+        Population index used to key draws from random.
+    random : vivarium.framework.randomness.RandomnessStream
+        Module randomness stream. Falls back to numpy's global generator if not given.
+
+    Returns
+    -------
+    np.ndarray
+        Drawn count for each simulant.
+    """
+    if random is not None:
+        draws = random.get_draw(index, additional_key='zero').to_numpy()
+        count_draws = random.get_draw(index, additional_key='count').to_numpy()
+        # The inverse CDF is -1 at a draw of exactly 0.
+        poisson = np.maximum(stats.poisson.ppf(count_draws, counts), 0)
+    else:
+        draws = np.random.uniform(size=zeros.shape)
+        poisson = np.random.poisson(counts).astype(float)
+    return np.where(draws < zeros, 0.0, poisson)
+
+
+def predict_next_timestep_alcohol_zip(model, current, random=None):
+    """ Get next state for alcohol monthly expenditure using zero inflated poisson models.
+
+    Parameters
+    ----------
+    model : dict
+        Exported zeroinfl model loaded in from .json file
+    current : pd.DataFrame
+        current population dataframe. Not modified.
+    random : vivarium.framework.randomness.RandomnessStream
+        Module randomness stream used to draw who drinks.
+
+    Returns
+    -------
+    np.ndarray
+        Next monthly alcohol expenditure for each simulant.
+    """
+    # model is fitted on spending in units of £50.
+    current = current.assign(alcohol_spending=current['alcohol_spending'] // 50)
+    counts, zeros = predict_zip_parts(model, current)
+    preds = draw_zip(counts, zeros, current.index, random)
+    # round up to nearest integer and times by 50 to get actual expenditure back.
+    return np.ceil(preds) * 50
+
+
+def predict_next_timestep_tobacco_zip(model, current, random=None):
+    """ Get next state for number of cigarettes smoked using zero inflated poisson models.
+
+    Parameters
+    ----------
+    model : dict
+        Exported zeroinfl model loaded in from .json file
+    current : pd.DataFrame
+        current population dataframe.
+    random : vivarium.framework.randomness.RandomnessStream
+        Module randomness stream used to draw who smokes.
+
+    Returns
+    -------
+    np.ndarray
+        Next number of cigarettes for each simulant.
+    """
+    counts, zeros = predict_zip_parts(model, current)
+    preds = draw_zip(counts, zeros, current.index, random)
+    return np.ceil(preds) * 5 #rescale back up to ncigs.
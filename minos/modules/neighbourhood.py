@@ -5,7 +5,6 @@ Calculation of change in neighbourhood quality in minos.
 
 import pandas as pd
 from pathlib import Path
-import minos.modules.r_utils as r_utils
 from minos.modules.base_module import Base
 import matplotlib.pyplot as plt
 from seaborn import catplot
@@ -38,6 +37,8 @@ class Neighbourhood(Base):
         # Assign randomness streams if necessary.
         self.random = builder.randomness.get_stream(self.generate_random_crn_key())
 
+        self.transition_utils = self.get_transition_utils(builder.configuration)
+
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
         # view_columns is the columns from the main population used in this module.
@@ -64,7 +65,7 @@ class Neighbourhood(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=3)
+        self.register_time_step(builder, priority=3, writes=["neighbourhood_safety"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -75,20 +76,17 @@ class Neighbourhood(Base):
             The event time_step that called this function.
         """
         # Get living people to update their neighbourhood
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         self.year = event.time.year
 
         ## Predict next neighbourhood value
         neighbourhood_prob_df = self.calculate_neighbourhood(pop)
 
-        neighbourhood_prob_df["neighbourhood_safety"] = self.random.choice(neighbourhood_prob_df.index,
-                                                                           list(neighbourhood_prob_df.columns),
-                                                                           neighbourhood_prob_df)+1
-        neighbourhood_prob_df.index = neighbourhood_prob_df.index.astype(int)
-
         # Draw individuals next states randomly from this distribution.
+        neighbourhood_safety = self.sample_categories(pop.index, neighbourhood_prob_df) + 1
+
         # Update population with new neighbourhood
-        self.population_view.update(neighbourhood_prob_df['neighbourhood_safety'])
+        self.population_view.update(pd.Series(neighbourhood_safety, index=pop.index, name="neighbourhood_safety"))
 
 
     def calculate_neighbourhood(self, pop):
@@ -113,9 +111,9 @@ class Neighbourhood(Base):
             year -= 1 # e.g. 2012 moves back one year to 2011.
 
         year = min(year, 2014) # transitions only go up to 2014.
-        transition_model = r_utils.load_transitions(f"neighbourhood/clm/neighbourhood_clm_{year}_{year + 3}")
-        # The calculation relies on the R predict method and the model that has already been specified
-        nextWaveNeighbourhood = r_utils.predict_next_timestep_clm(transition_model, pop)
+        transition_model = self.transition_utils.load_transitions(f"neighbourhood/clm/neighbourhood_clm_{year}_{year + 3}")
+        # The calculation uses the predict method of the chosen backend and the model that has already been specified
+        nextWaveNeighbourhood = self.transition_utils.predict_next_timestep_clm(transition_model, pop)
         return nextWaveNeighbourhood
 
     # Special methods used by vivarium.
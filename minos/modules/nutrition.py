@@ -4,7 +4,6 @@ Calculation of weekly consumption of fruit and veg.
 """
 
 import pandas as pd
-import minos.modules.r_utils as r_utils
 from minos.modules.base_module import Base
 
 class Nutrition(Base):
@@ -35,6 +34,8 @@ class Nutrition(Base):
         # Assign randomness streams if necessary.
         self.random = builder.randomness.get_stream(self.generate_random_crn_key())
 
+        self.transition_utils = self.get_transition_utils(builder.configuration)
+
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
         # view_columns is the columns from the main population used in this module.
@@ -63,7 +64,7 @@ class Nutrition(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=3)
+        self.register_time_step(builder, priority=3, writes=["nutrition_quality"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -76,7 +77,7 @@ class Nutrition(Base):
         self.year = event.time.year
 
         # Get living people to update their income
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
 
         ## Predict next income value
         newWaveNutrition = self.calculate_nutrition(pop).round(0).astype(int)
@@ -100,8 +101,8 @@ class Nutrition(Base):
         -------
         """
         #year = min(self.year, 2018)
-        transition_model = r_utils.load_transitions(f"nutrition/ols/nutrition_ols_2018_2019")
-        return r_utils.predict_next_timestep_ols(transition_model, pop, 'nutrition_quality')
+        transition_model = self.transition_utils.load_transitions(f"nutrition/ols/nutrition_ols_2018_2019")
+        return self.transition_utils.predict_next_timestep_ols(transition_model, pop, 'nutrition_quality')
 
 
     # Special methods used by vivarium.
@@ -0,0 +1,87 @@
+"""
+Indexes of frequently selected subsets of the population.
+
+Almost every time step listener starts by selecting the alive population with query="alive == 'alive'", which parses
+the query string and compares the whole alive column every time. Instead, the simulants in each subset are kept as a
+boolean mask over simulant indices and updated only for the simulants whose status changes:
+
+- alive: updated by Mortality when simulants are created or die, and by Replenishment when cohorts are loaded.
+- female: updated when cohorts are loaded and when new births are assigned a sex (fertility).
+
+Modules select their simulants with Base.get_alive(event.index, ...) instead of query strings. The masks are rebuilt
+from the population table when a checkpoint is restored.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Indexed subsets. Name -> (column, value of the column for simulants in the subset).
+SUBSETS = {'alive': ('alive', 'alive'),
+           'female': ('sex', 'Female')}
+
+
+class PopulationIndex:
+    """ Simulants in each indexed subset of the population."""
+
+    def __init__(self, subsets=SUBSETS):
+        self.subsets = subsets
+        self.clear()
+
+    def clear(self):
+        """ Forget every simulant. RunPipeline clears the index before setting a simulation up."""
+        self.masks = {name: np.zeros(0, dtype=bool) for name in self.subsets}
+
+    def record(self, pop):
+        """ Update subsets for simulants whose columns have just been written.
+
+        Parameters
+        ----------
+        pop : pd.DataFrame
+            Update just applied to the population. Subsets whose column is not in it are unchanged.
+        """
+        positions = pop.index.to_numpy()
+        if len(positions) == 0:
+            return
+        for name, (column, value) in self.subsets.items():
+            if column not in pop.columns:
+                continue
+            mask = self.masks[name]
+            if positions.max() >= len(mask):
+                # New simulants are always added at the end of the population table.
+                mask = np.concatenate([mask, np.zeros(positions.max() + 1 - len(mask), dtype=bool)])
+                self.masks[name] = mask
+            mask[positions] = (pop[column] == value).to_numpy()
+
+    def rebuild(self, table):
+        """ Index a whole population table. E.g. one restored from a checkpoint."""
+        self.clear()
+        self.record(table)
+
+    def select(self, index, *subsets):
+        """ Simulants of an index that are in every given subset.
+
+        Parameters
+        ----------
+        index : pd.Index
+            Simulants to select from. Usually event.index.
+        subsets : str
+            Names of indexed subsets. E.g. 'alive', 'female'.
+
+        Returns
+        -------
+        pd.Index
+            Selected simulants in their original order.
+        """
+        positions = index.to_numpy()
+        keep = np.ones(len(index), dtype=bool)
+        for name in subsets:
+            mask = self.masks[name]
+            in_subset = np.zeros(len(index), dtype=bool)
+            known = positions < len(mask)
+            in_subset[known] = mask[positions[known]]
+            keep &= in_subset
+        return index[keep]
+
+
+# Index shared by every module in the process.
+population_index = PopulationIndex()
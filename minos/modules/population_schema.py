@@ -0,0 +1,228 @@
+"""
+Declared column types of the MINOS population table.
+
+Cohorts read from csv leave enumerations as object columns of Python strings and every number as 64 bit. The schema
+stores the population compactly instead:
+
+- enumerations (sex, ethnicity, region, alive, labour_state etc.) are categoricals. Categories are added as new
+  values appear so no value is ever lost.
+- integer codes (education_state, job_sector, birth_year etc.) use a small integer type. A column with values that do
+  not fit is given a wider integer type, and a column with missing values is stored as float32 instead.
+- continuous scores (SF_12, ncigs, nutrition_quality etc.) are float32.
+
+Income, wages, spending and other money columns, age and any column not listed keep their type.
+
+Every update made through a module's population view is cast to the schema (see Base.population_view). Vivarium
+refuses updates that change a column's type once the simulation is running, so updates computed as float64 or object
+are cast back to the column's type rather than rejected. The only type changes made are explicit widenings checked
+before each update: new categories are added to a categorical column, an integer column given a value outside its
+type's range is given a wider integer type, and an integer column given a missing or fractional value is stored as
+float32 from then on. Set population_schema: false in the config to turn the schema off.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Enumerations stored as categoricals.
+CATEGORICAL_COLUMNS = ['sex', 'ethnicity', 'region', 'alive', 'labour_state', 'cause_of_death', 'Date']
+
+# Integer codes and the type used for each.
+INTEGER_COLUMNS = {'education_state': 'int8',
+                   'max_educ': 'int8',
+                   'housing_quality': 'int8',
+                   'neighbourhood_safety': 'int8',
+                   'loneliness': 'int8',
+                   'nkids': 'int8',
+                   'nobs': 'int8',
+                   'job_sec': 'int8',
+                   'job_sector': 'int8',
+                   'birth_month': 'int8',
+                   'hh_int_m': 'int8',
+                   'birth_year': 'int16',
+                   'hh_int_y': 'int16',
+                   'time': 'int16',
+                   'academic_year': 'int16',
+                   'job_duration_m': 'int16',
+                   'job_duration_y': 'int16',
+                   'job_industry': 'int16',
+                   'job_occupation': 'int16'}
+
+# Continuous columns that do not need double precision.
+FLOAT32_COLUMNS = ['SF_12', 'SF_12p', 'depression', 'ncigs', 'ndrinks', 'nutrition_quality', 'weight', 'job_hours',
+                   'job_hours_se']
+
+
+class PopulationSchema:
+    """ Casts population columns to their declared types."""
+
+    def __init__(self):
+        # Set to False to leave columns as they are. RunPipeline sets this from population_schema in the config.
+        self.enabled = True
+
+    @staticmethod
+    def cast_integer(values, dtype):
+        """ Cast integer codes to dtype, or float32 if they have missing or fractional values.
+
+        Values that do not fit in dtype are cast to the smallest wider integer type that holds them instead.
+        """
+        if not pd.api.types.is_integer_dtype(values.dtype):
+            numbers = values.to_numpy(dtype=float)
+            if np.isnan(numbers).any() or not np.all(np.mod(numbers, 1) == 0):
+                return values.astype('float32')
+        if len(values) == 0:
+            return values.astype(dtype)
+        low, high = values.min(), values.max()
+        for wider in ['int8', 'int16', 'int32', 'int64']:
+            info = np.iinfo(wider)
+            if np.dtype(wider).itemsize >= np.dtype(dtype).itemsize and info.min <= low and high <= info.max:
+                return values.astype(wider)
+        return values.astype('int64')
+
+    @staticmethod
+    def cast_categorical(values, table=None):
+        """ Cast values to the categorical type of the matching population column.
+
+        If the values have categories the population column does not, they are cast to the column's categories with the
+        new ones added. The population table itself is not changed. See widened_dtypes.
+        """
+        name = values.name
+        if table is not None and name in table.columns and isinstance(table[name].dtype, pd.CategoricalDtype):
+            dtype = table[name].dtype
+            new = pd.Index(values.dropna().unique()).difference(dtype.categories)
+            if len(new) > 0:
+                dtype = pd.CategoricalDtype(dtype.categories.append(new), ordered=dtype.ordered)
+            return values.astype(dtype)
+        return values.astype('category')
+
+    def conform(self, pop, table=None):
+        """ Cast an update or loaded cohort to the schema.
+
+        Parameters
+        ----------
+        pop : pd.DataFrame or pd.Series
+            Population columns.
+        table : pd.DataFrame
+            Population table the update is for. Categorical columns share its categories and integer columns follow
+            it if it is already stored as float32. It is not changed.
+
+        Returns
+        -------
+        pd.DataFrame or pd.Series
+            pop with every declared column cast to its schema type.
+        """
+        if not self.enabled:
+            return pop
+        if isinstance(pop, pd.Series):
+            return self.conform(pop.to_frame(), table)[pop.name]
+        columns = {}
+        for name in pop.columns:
+            values = pop[name]
+            if name in CATEGORICAL_COLUMNS:
+                columns[name] = self.cast_categorical(values, table)
+            elif name in INTEGER_COLUMNS and pd.api.types.is_numeric_dtype(values.dtype):
+                # Follow a population column already stored as float32 because it had missing values, or already
+                # widened to a larger integer type.
+                dtype = INTEGER_COLUMNS[name]
+                existing = table[name].dtype if table is not None and name in table.columns else None
+                if existing == np.float32:
+                    columns[name] = values.astype('float32')
+                    continue
+                if existing is not None and pd.api.types.is_integer_dtype(existing) and \
+                        existing.itemsize > np.dtype(dtype).itemsize:
+                    dtype = existing
+                columns[name] = self.cast_integer(values, dtype)
+            elif name in FLOAT32_COLUMNS and pd.api.types.is_numeric_dtype(values.dtype):
+                columns[name] = values.astype('float32')
+        return pop.assign(**columns) if columns else pop
+
+    @staticmethod
+    def widened_dtypes(update, table):
+        """ Population columns whose type must change for a conformed update to be applied.
+
+        Three changes are allowed:
+
+        - a categorical column gains the update's new categories.
+        - an integer column is given a wider integer type once an update gives it values outside its range.
+        - an integer column is stored as float32 once an update gives it missing or fractional values.
+
+        Vivarium refuses updates that change a column's type, so these columns are widened before the update.
+
+        Returns
+        -------
+        dict
+            Column name -> type the population column must be stored as.
+        """
+        widened = {}
+        for name in update.columns.intersection(table.columns):
+            old, new = table[name].dtype, update[name].dtype
+            if isinstance(old, pd.CategoricalDtype) and isinstance(new, pd.CategoricalDtype):
+                if len(new.categories) > len(old.categories):
+                    widened[name] = new
+            elif pd.api.types.is_integer_dtype(old) and new == np.float32:
+                widened[name] = new
+            elif pd.api.types.is_integer_dtype(old) and pd.api.types.is_integer_dtype(new) and \
+                    new.itemsize > old.itemsize:
+                widened[name] = new
+        return widened
+
+
+# Schema shared by every module in the process.
+schema = PopulationSchema()
+
+
+def population_table(view):
+    """ Population table behind a vivarium population view.
+
+    Vivarium has no public access to the table itself, so this is the one place the schema reaches into it.
+    """
+    return view._manager._population
+
+
+def restore_dtypes(table, dtypes):
+    """ Narrow widened columns back to their previous types where no value would be lost."""
+    for name, dtype in dtypes.items():
+        column = table[name]
+        if isinstance(dtype, pd.CategoricalDtype):
+            lossless = column.isin(dtype.categories).to_numpy() | column.isna().to_numpy()
+        else:
+            numbers = column.to_numpy(dtype=float)
+            info = np.iinfo(dtype)
+            lossless = ~np.isnan(numbers) & (np.mod(numbers, 1) == 0) & (numbers >= info.min) & (numbers <= info.max)
+        if lossless.all():
+            table[name] = column.astype(dtype)
+
+
+class TypedView:
+    """ Population view casting every update to the population schema."""
+
+    def __init__(self, view):
+        self.view = view
+
+    def get(self, *args, **kwargs):
+        return self.view.get(*args, **kwargs)
+
+    def update(self, pop):
+        """ Cast an update to the schema and apply it.
+
+        Columns are only widened (see PopulationSchema.widened_dtypes) for updates to simulants already in the table.
+        Anything else is passed on unchanged for vivarium to reject. If vivarium rejects a widened update, the columns
+        are narrowed back.
+        """
+        table = population_table(self.view)
+        pop = schema.conform(pop, table)
+        frame = pop.to_frame() if isinstance(pop, pd.Series) else pop
+        if not frame.index.isin(table.index).all():
+            self.view.update(pop)
+            return
+        widened = schema.widened_dtypes(frame, table)
+        original = {name: table[name].dtype for name in widened}
+        for name, dtype in widened.items():
+            table[name] = table[name].astype(dtype)
+        try:
+            self.view.update(pop)
+        except Exception:
+            restore_dtypes(table, original)
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.view, name)
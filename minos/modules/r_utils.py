@@ -4,6 +4,13 @@ R utility functions. These are currently all related to the use of transition mo
 # TODO figure out scaling of variables in Rpy2. makes models more stable.
 # TODO: Rewrite all these functions to generalise more. Lots of duplicated code
 
+import atexit
+import functools
+import logging
+import multiprocessing
+import time
+from contextlib import contextmanager
+
 import rpy2.robjects as ro
 from rpy2.robjects import pandas2ri
 from rpy2.robjects.packages import importr
@@ -12,6 +19,341 @@ from rpy2.robjects.vectors import FactorVector
 import pandas as pd
 import numpy as np
 
+from minos.modules.model_cache import transition_models
+from minos.modules.native_utils import draw_zip
+from minos.modules.unique_profiles import by_profile
+
+
+class RSession:
+    """ Embedded R state shared by every R transition prediction.
+
+    Packages are attached, the pandas converter is built and R function handles are looked up once when the session
+    is started. Time spent converting data to and from R and inside R's predict is accumulated so it can be reported.
+
+    Population frames are sent to R as Arrow tables when pyarrow, rpy2_arrow and the R arrow package are installed.
+    Numeric columns are then passed as Arrow buffers rather than copied element by element, and categoricals arrive
+    as R factors. Otherwise the pandas2ri converter is used.
+    """
+
+    # Ways of sending data frames to R. auto uses arrow if it is available.
+    exchanges = ('auto', 'arrow', 'pandas2ri')
+
+    # R packages needed to predict every transition model type.
+    packages = ('base', 'stats', 'ordinal', 'nnet', 'pscl')
+
+    def __init__(self):
+        self.started = False
+        self.exchange = None
+        self.startup_time = 0.0
+        self.time_in_r = 0.0
+        self.calls = 0
+
+    def start(self, exchange='auto'):
+        """ Attach R packages and build converters and function handles. Does nothing if already started.
+
+        Parameters
+        ----------
+        exchange : str
+            How data frames are sent to R. One of 'auto', 'arrow' or 'pandas2ri'. 'arrow' falls back to pandas2ri
+            with a warning if arrow is not installed.
+
+        Returns
+        -------
+        RSession
+            This session, so calls can be chained.
+        """
+        if self.started:
+            return self
+        if exchange not in self.exchanges:
+            raise ValueError(f"Unknown R data exchange '{exchange}'. Use one of {self.exchanges}.")
+        start = time.perf_counter()
+        self.libraries = {package: importr(package) for package in self.packages}
+        self.converter = ro.default_converter + pandas2ri.converter
+        self.read_rds = self.libraries['base'].readRDS
+        self.r_predict = self.libraries['stats'].predict
+        # Variables a fitted model needs from new data. zeroinfl keeps both the count and zero parts in its full
+        # model frame terms. clm scale and nominal terms are included where a model has them.
+        self.model_variables = ro.r("""
+        function(model) {
+          if (inherits(model, "zeroinfl")) return(all.vars(model$terms$full))
+          unique(c(all.vars(terms(model)), all.vars(model$S.terms), all.vars(model$nom.terms)))
+        }
+        """)
+        # Data frame from a named list of already converted columns without copying them again.
+        self.list_to_data_frame = ro.r['list2DF']
+        self.exchange = 'pandas2ri'
+        if exchange != 'pandas2ri':
+            if self.start_arrow():
+                self.exchange = 'arrow'
+            elif exchange == 'arrow':
+                logging.warning("Arrow data exchange requested but pyarrow, rpy2_arrow or the R arrow package is not "
+                                "installed. Using pandas2ri instead.")
+        self.started = True
+        self.startup_time = time.perf_counter() - start
+        return self
+
+    def start_arrow(self):
+        """ Set up Arrow exchange if pyarrow, rpy2_arrow and the R arrow package are installed.
+
+        Returns
+        -------
+        bool
+            True if Arrow exchange can be used.
+        """
+        try:
+            import pyarrow
+            import rpy2_arrow.arrow as rpy2_arrow
+        except ImportError:
+            return False
+        if not ro.r('requireNamespace("arrow", quietly = TRUE)')[0]:
+            return False
+        self.pyarrow = pyarrow
+        self.pyarrow_to_r = rpy2_arrow.pyarrow_table_to_r_table
+        # arrow's as.data.frame gives a tibble. Convert again for a plain data.frame that every predict method accepts.
+        self.arrow_as_data_frame = ro.r('function(table) as.data.frame(as.data.frame(table))')
+        return True
+
+    @contextmanager
+    def timed(self):
+        """ Context adding the time spent inside it to time_in_r."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.time_in_r += time.perf_counter() - start
+            self.calls += 1
+
+    def to_r(self, data):
+        """ Convert a pandas object to R. Data frames use Arrow exchange if available."""
+        self.start()
+        with self.timed():
+            if self.exchange == 'arrow' and isinstance(data, pd.DataFrame):
+                table = self.pyarrow.Table.from_pandas(data, preserve_index=False)
+                return self.arrow_as_data_frame(self.pyarrow_to_r(table))
+            with localconverter(self.converter):
+                return ro.conversion.py2rpy(data)
+
+    def to_python(self, data):
+        """ Convert an R object back to pandas/numpy."""
+        self.start()
+        with self.timed(), localconverter(self.converter):
+            return ro.conversion.rpy2py(data)
+
+    def predict(self, model, data, **kwargs):
+        """ Call R's predict generic. Keyword arguments are passed on, e.g. type="prob"."""
+        self.start()
+        with self.timed():
+            return self.r_predict(r_object(model), data, **kwargs)
+
+    def timings(self):
+        """ Summary of time spent in R.
+
+        Returns
+        -------
+        dict
+            Seconds spent starting the session and inside R (conversions and predict), and the number of timed calls.
+        """
+        return {'started': self.started,
+                'exchange': self.exchange,
+                'columns_converted': snapshot.converted,
+                'columns_reused': snapshot.reused,
+                'startup_seconds': round(self.startup_time, 3),
+                'seconds_in_r': round(self.time_in_r, 3),
+                'calls': self.calls}
+
+
+class PopulationSnapshot:
+    """ R copies of population columns shared by every R prediction within a time step.
+
+    Modules predicting through R all use the same alive population in a time step, and most of the columns they
+    need are not changed by the modules that run before them. Each column is converted once and kept with a pandas
+    copy of the values it was converted from. A module's data frame is assembled from these R columns, and only
+    columns that are new, or whose values changed since they were converted (e.g. SF_12 after MWB), are converted
+    again. Modules still predict one after another, so every module sees the updates of the modules before it.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.columns = {}
+        self.converted = 0
+        self.reused = 0
+        self.attached = True
+
+    def clear(self):
+        """ Drop all converted columns."""
+        self.index = None
+        self.columns = {}
+
+    @contextmanager
+    def detached(self):
+        """ Context converting frames directly, without using or replacing the shared columns.
+
+        Used for frames that are not the time step's population (e.g. unique covariate profiles) so they do not
+        discard the columns already converted for it.
+        """
+        self.attached = False
+        try:
+            yield
+        finally:
+            self.attached = True
+
+    @staticmethod
+    def as_factors(frame):
+        """ Frame with string columns as categoricals so R receives factors built from integer codes."""
+        string_columns = frame.select_dtypes(include=['object', 'string']).columns
+        if len(string_columns) > 0:
+            frame = frame.astype({column: 'category' for column in string_columns})
+        return frame
+
+    def to_r(self, covariates):
+        """ R data frame of covariates, reusing converted columns where their values have not changed.
+
+        Parameters
+        ----------
+        covariates : pd.DataFrame
+            Population columns a model needs.
+
+        Returns
+        -------
+        rpy2.robjects.DataFrame
+            R data frame with the columns of covariates in order.
+        """
+        if not self.attached:
+            return session.to_r(self.as_factors(covariates))
+
+        if self.index is None or not covariates.index.equals(self.index):
+            # New time step or a different subset of the population. Nothing converted so far can be reused.
+            self.clear()
+            self.index = covariates.index.copy()
+
+        stale = [column for column in covariates.columns
+                 if column not in self.columns or not self.columns[column][0].equals(covariates[column])]
+        if stale:
+            converted = session.to_r(self.as_factors(covariates[stale]))
+            for column in stale:
+                self.columns[column] = (covariates[column].copy(), converted.rx2(column))
+        self.converted += len(stale)
+        self.reused += len(covariates.columns) - len(stale)
+
+        with session.timed():
+            return session.list_to_data_frame(ro.vectors.ListVector({column: self.columns[column][1]
+                                                                     for column in covariates.columns}))
+
+
+# Single session shared by every module in the process. Started by RunPipeline when the R backend is used.
+session = RSession()
+# Converted population columns shared by every R prediction.
+snapshot = PopulationSnapshot()
+
+
+class RWorkerPool:
+    """ Pool of R worker processes that predict transition models over row chunks of the population.
+
+    Each worker is a separate spawned python process with its own embedded R session and model cache. Fitted models
+    cannot be pickled, so workers are sent the model's .rds file and the chunk's covariates, load (and cache) the
+    model themselves, and return their chunk's predictions. Chunks are reassembled in population order.
+    """
+
+    def __init__(self):
+        self.pool = None
+        self.workers = 0
+        self.min_rows = 0
+        # Make sure worker processes do not outlive an interrupted run. close does nothing if no pool is running.
+        atexit.register(self.close)
+
+    @property
+    def active(self):
+        return self.pool is not None
+
+    def start(self, workers, exchange='auto', min_rows=10000):
+        """ Start the worker processes. Does nothing if workers is less than 2 or the pool is already running.
+
+        Parameters
+        ----------
+        workers : int
+            Number of R worker processes.
+        exchange : str
+            Data exchange used by each worker's R session. See RSession.start.
+        min_rows : int
+            Populations smaller than this are predicted in this process. Chunking small frames costs more than it saves.
+        """
+        if self.active or workers < 2:
+            return
+        context = multiprocessing.get_context('spawn')
+        self.pool = context.Pool(workers, initializer=start_worker, initargs=(exchange,))
+        self.workers = workers
+        self.min_rows = min_rows
+        logging.info(f"Started {workers} R worker processes.")
+
+    def predict(self, name, filename, current, *args, **kwargs):
+        """ Predict over row chunks of current in the workers and combine the results in order.
+
+        Parameters
+        ----------
+        name : str
+            Name of the r_utils predict function.
+        filename : str
+            .rds file of the fitted model.
+        current : pd.DataFrame
+            Covariates to predict for.
+        args, kwargs
+            Passed on to the predict function.
+        """
+        chunks = [current.iloc[rows] for rows in np.array_split(np.arange(len(current)), self.workers)]
+        results = self.pool.starmap(predict_chunk, [(name, filename, chunk, args, kwargs) for chunk in chunks])
+        return combine_chunks(results)
+
+    def close(self):
+        """ Shut down the worker processes."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+            logging.info("Stopped R worker processes.")
+
+
+def start_worker(exchange):
+    """ Start the R session of a worker process."""
+    session.start(exchange)
+
+
+def predict_chunk(name, filename, chunk, args, kwargs):
+    """ Predict one chunk in a worker process with the serial version of an r_utils predict function."""
+    model = transition_models.get(filename, read_model)
+    return globals()[name].serial(model, chunk, *args, **kwargs)
+
+
+def combine_chunks(results):
+    """ Concatenate chunk predictions in order. Handles frames, arrays and tuples of either."""
+    first = results[0]
+    if isinstance(first, tuple):
+        return tuple(combine_chunks(list(parts)) for parts in zip(*results))
+    if isinstance(first, (pd.DataFrame, pd.Series)):
+        return pd.concat(results)
+    return np.concatenate(results)
+
+
+# Worker processes shared by every module. Started by RunPipeline if r_workers is set in the config.
+worker_pool = RWorkerPool()
+
+
+def chunked(function):
+    """ Decorator running an r_utils predict function in the worker pool when it is running.
+
+    The decorated function takes the fitted model and population as its first two arguments. The original function is
+    kept as .serial and is what workers run on their chunk.
+    """
+    @functools.wraps(function)
+    def wrapper(model, current, *args, **kwargs):
+        filename = model_file(model)
+        if worker_pool.active and filename is not None and len(current) >= worker_pool.min_rows:
+            columns = [column for column in model_columns(model) if column in current.columns]
+            with session.timed():
+                return worker_pool.predict(function.__name__, filename, current[columns], *args, **kwargs)
+        return function(model, current, *args, **kwargs)
+    wrapper.serial = function
+    return wrapper
+
 
 def load_transitions(component, path = 'data/transitions/'):
     """
@@ -27,17 +369,105 @@ def load_transitions(component, path = 'data/transitions/'):
     Returns:
     -------
     An RDS object containing a fitted model for prediction.
+
+    Notes
+    -----
+    Models are held in a process-wide cache keyed by file path and modification time, so repeated calls for the
+    same model (e.g. every year after the last fitted transition) only read the .rds file once.
     """
-    # import base R package
-    base = importr('base')
 
-    # generate filename from arguments and load model
+    # generate filename from arguments and load model (from the cache if already read).
     filename = f"{path}{component}.rds"
-    model = base.readRDS(filename)
+    return transition_models.get(filename, read_model)
+
+
+class RModel:
+    """ Fitted R model with the .rds file it was loaded from and the population columns it uses.
+
+    The file lets worker processes load the model too. Both are kept on the model so they are evicted from the model
+    cache along with it.
+    """
+
+    def __init__(self, model, filename):
+        self.model = model
+        self.filename = filename
+        self.variables = None
+
+    def rx2(self, name):
+        return self.model.rx2(name)
+
+
+def read_model(filename):
+    """ Load a fitted model from an .rds file. Loader for the model cache."""
+    return RModel(session.start().read_rds(filename), filename)
+
+
+def r_object(model):
+    """ R object of a model loaded by load_transitions or of a model read directly from R."""
+    return model.model if isinstance(model, RModel) else model
+
+
+def model_file(model):
+    """ .rds file a model was loaded from by load_transitions, or None if it was loaded some other way."""
+    return model.filename if isinstance(model, RModel) else None
+
+
+def model_columns(model):
+    """ Variables used by a fitted model. Read from R once per model and cached.
+
+    Parameters
+    ----------
+    model : R rds object
+        Fitted model loaded in from .rds file
+
+    Returns
+    -------
+    list
+        Variable names in the model terms, including the response.
+    """
+    if not isinstance(model, RModel):
+        return list(session.start().model_variables(model))
+    if model.variables is None:
+        model.variables = list(session.start().model_variables(model.model))
+    return model.variables
+
+
+def convert_population(model, current):
+    """ Convert the population columns a model uses to an R data frame.
+
+    Columns the model never uses (pidp, the module's own outputs etc.) are not converted. String columns are converted
+    as pandas categoricals so R receives factors built from integer codes instead of a copy of every string.
+    R accepts a factor wherever the model was fitted on a character column.
+    Columns already converted for an earlier module in the same time step are reused if unchanged. See
+    PopulationSnapshot.
+
+    Parameters
+    ----------
+    model : R rds object
+        Fitted model loaded in from .rds file
+    current : pd.DataFrame
+        Population to predict for.
+
+    Returns
+    -------
+    rpy2.robjects.DataFrame
+        R data frame of the covariates in current.
+    """
+    columns = [column for column in model_columns(model) if column in current.columns]
+    return snapshot.to_r(current[columns])
 
-    return model
 
+def profile_columns(model, current):
+    """ Population columns a fitted model uses, for predicting once per unique profile. See unique_profiles.
 
+    scale() terms of lm, clm, multinom and zeroinfl models keep the centre and scale from fitting, so every row
+    can be predicted independently.
+    """
+    return [column for column in model_columns(model) if column in current.columns]
+
+
+@by_profile(profile_columns, snapshot.detached)
+@chunked
 def predict_next_timestep_ols(model, current, independant):
     """
     This function will take the transition model loaded in load_transitions() and use it to predict the next timestep
@@ -54,28 +484,18 @@ def predict_next_timestep_ols(model, current, independant):
     -------
     A prediction of the information for next timestep
     """
-    # import R packages
-    base = importr('base')
-    stats = importr('stats')
-
-    # Convert from pandas to R using package converter
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        currentRDF = ro.conversion.py2rpy(current)
+    # Convert the columns the model uses from pandas to R using package converter
+    currentRDF = convert_population(model, current)
 
-    # R predict method returns a Vector of predicted values, so need to be bound to original df and converter to Pandas
-    prediction = stats.predict(model, currentRDF)
-    newRPopDF = base.cbind(currentRDF, predicted = prediction)
-    # Convert back to pandas
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        newPandasPopDF = ro.conversion.rpy2py(newRPopDF)
+    # R predict method returns a Vector of predicted values in population order. Only this vector is converted back.
+    prediction = session.predict(model, currentRDF)
+    prediction = session.to_python(prediction)
 
-    # Now rename the predicted var (have to drop original column first)
-    newPandasPopDF[[independant]] = newPandasPopDF[['predicted']]
-    newPandasPopDF.drop(labels=['predicted'], axis='columns', inplace=True)
-
-    return newPandasPopDF[[independant]]
+    return pd.DataFrame({independant: np.asarray(prediction, dtype=float)}, index=current.index)
 
 
+@by_profile(profile_columns, snapshot.detached)
+@chunked
 def predict_next_timestep_clm(model, current):
     """
     This function will take the transition model loaded in load_transitions() and use it to predict the next timestep
@@ -88,15 +508,8 @@ def predict_next_timestep_clm(model, current):
     -------
     A prediction of the information for next timestep
     """
-    # import R packages
-    base = importr('base')
-    stats = importr('stats')
-    ordinal = importr('ordinal')
-
-    # Convert from pandas to R using package converter
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        currentRDF = ro.conversion.py2rpy(current)
-
+    # Convert the columns the model uses from pandas to R using package converter
+    currentRDF = convert_population(model, current)
 
     # NOTE clm package predict function is a bit wierdly written. The predict type "prob" gives the probability of an
     # individual belonging to each possible next state. If there are 4 states this is a 4xn matrix.
@@ -104,15 +517,17 @@ def predict_next_timestep_clm(model, current):
     # in next true state (1xn matrix). Not an issue here as next housing state y isn't in the vivarium population.
 
     # R predict.clm method returns a matrix of probabilities of beloning in each state.
-    prediction = stats.predict(model, currentRDF, type="prob")
+    prediction = session.predict(model, currentRDF, type="prob")
 
     # Convert prob matrix back to pandas.
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        prediction_matrix_list = ro.conversion.rpy2py(prediction[0])
-    predictionDF = pd.DataFrame(prediction_matrix_list)
+    prediction_matrix_list = session.to_python(prediction[0])
+    # Keep the population index so probabilities line up with the simulants they were predicted for.
+    predictionDF = pd.DataFrame(prediction_matrix_list, index=current.index)
     return predictionDF
 
 
+@by_profile(profile_columns, snapshot.detached)
+@chunked
 def predict_next_timestep_SF12(model, current):
     """
     This function will take the transition model loaded in load_transitions() and use it to predict the next timestep
@@ -129,28 +544,18 @@ def predict_next_timestep_SF12(model, current):
     -------
     A prediction of the information for next timestep
     """
-    # import R packages
-    base = importr('base')
-    stats = importr('stats')
-
-    # Convert from pandas to R using package converter
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        currentRDF = ro.conversion.py2rpy(current)
-
-    # R predict method returns a Vector of predicted values, so need to be bound to original df and converter to Pandas
-    prediction = stats.predict(model, currentRDF)
-    newRPopDF = base.cbind(currentRDF, SF_12 = prediction)
-    # Convert back to pandas
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        newPandasPopDF = ro.conversion.rpy2py(newRPopDF)
+    # Convert the columns the model uses from pandas to R using package converter
+    currentRDF = convert_population(model, current)
 
-    # Now rename the predicted var (have to drop original column first)
-    #newPandasPopDF[[independant]] = newPandasPopDF[['predicted']]
-    #newPandasPopDF.drop(labels=['predicted'], axis='columns', inplace=True)
+    # R predict method returns a Vector of predicted values in population order. Only this vector is converted back.
+    prediction = session.predict(model, currentRDF)
+    prediction = session.to_python(prediction)
 
-    return newPandasPopDF[["SF_12"]]
+    return pd.DataFrame({"SF_12": np.asarray(prediction, dtype=float)}, index=current.index)
 
 
+@by_profile(profile_columns, snapshot.detached)
+@chunked
 def predict_next_timestep_labour_nnet(model, current):
     """Function for predicting next state using labour nnet models.
 
@@ -161,33 +566,20 @@ def predict_next_timestep_labour_nnet(model, current):
     -------
 
     """
-    # import R packages
-    base = importr('base')
-    stats = importr('stats')
-    nnet = importr("nnet")
-    # Convert from pandas to R using package converter
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        currentRDF = ro.conversion.py2rpy(current)
-
-
+    # Convert the columns the model uses from pandas to R using package converter
+    currentRDF = convert_population(model, current)
 
-    prediction = stats.predict(model, currentRDF, type="probs")
+    prediction = session.predict(model, currentRDF, type="probs")
 
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        newPandasPopDF = ro.conversion.rpy2py(prediction)
+    newPandasPopDF = session.to_python(prediction)
 
-    return pd.DataFrame(newPandasPopDF, columns = ["Employed",
-                                                   "Family Care",
-                                                   "Maternity Leave",
-                                                   "PT Employed",
-                                                   "Retired",
-                                                   "Self-employed",
-                                                   "Sick/Disabled",
-                                                   "Student",
-                                                   "Unemployed"])
+    # Class labels are the response levels the model was fitted with.
+    return pd.DataFrame(newPandasPopDF, index=current.index, columns=list(model.rx2('lev')))
 
 
 
+@by_profile(profile_columns, snapshot.detached)
+@chunked
 def predict_highest_educ_nnet(model, current):
     """Function for predicting highest level of education for the future replenishing populations using nnet model.
 
@@ -198,105 +590,98 @@ def predict_highest_educ_nnet(model, current):
     -------
 
     """
-    # import R packages
-    base = importr('base')
-    stats = importr('stats')
-    nnet = importr("nnet")
-    # Convert from pandas to R using package converter
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        currentRDF = ro.conversion.py2rpy(current)
+    # Convert the columns the model uses from pandas to R using package converter
+    currentRDF = convert_population(model, current)
 
-    prediction = stats.predict(model, currentRDF, type="probs")
+    prediction = session.predict(model, currentRDF, type="probs")
 
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        newPandasPopDF = ro.conversion.rpy2py(prediction)
+    newPandasPopDF = session.to_python(prediction)
 
-    return pd.DataFrame(newPandasPopDF, columns=['0',
-                                                 '1',
-                                                 '2',
-                                                 '3',
-                                                 '5',
-                                                 '6',
-                                                 '7'])
+    # Class labels are the response levels the model was fitted with.
+    return pd.DataFrame(newPandasPopDF, index=current.index, columns=list(model.rx2('lev')))
 
 
-def predict_next_timestep_alcohol_zip(model, current):
-    """ Get next state for alcohol monthly expenditure using zero inflated poisson models.
+@by_profile(profile_columns, snapshot.detached)
+@chunked
+def predict_zip_parts(model, current):
+    """ Count means and structural zero probabilities from a pscl zeroinfl model.
+
+    The population is converted to R once and used for both the "count" and "zero" predictions.
 
     Parameters
     ----------
-    model: ??? what type is this?
+    model: R zeroinfl object
+        Fitted model loaded in from .rds file
     current: pd.DataFrame
         current population dataframe.
 
     Returns
     -------
-
+    tuple
+        Numpy arrays of count means and zero probabilities for each row of current.
     """
-    current['alcohol_spending'] //= 50
-    base = importr('base')
-    stats = importr('stats')
-    zeroinfl = importr("pscl")
-
-    # grab transition model
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        currentRDF = ro.conversion.py2rpy(current)
+    # Convert the columns the model uses from pandas to R using package converter
+    currentRDF = convert_population(model, current)
 
     # grab count and zero prediction types
-    # count determines values if they actually drink
-    # zero determine probability of them not drinking
-    counts = stats.predict(model, currentRDF, type="count")
-    zeros = stats.predict(model, currentRDF, type="zero")
+    # count determines values if they actually drink/smoke
+    # zero determine probability of them not drinking/smoking
+    counts = session.predict(model, currentRDF, type="count")
+    zeros = session.predict(model, currentRDF, type="zero")
 
+    counts = session.to_python(counts)
+    zeros = session.to_python(zeros)
+    return np.asarray(counts, dtype=float), np.asarray(zeros, dtype=float)
 
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        counts = ro.conversion.rpy2py(counts)
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        zeros = ro.conversion.rpy2py(zeros)
 
+def predict_next_timestep_alcohol_zip(model, current, random=None):
+    """ Get next state for alcohol monthly expenditure using zero inflated poisson models.
+
+    Parameters
+    ----------
+    model: R zeroinfl object
+        Fitted model loaded in from .rds file
+    current: pd.DataFrame
+        current population dataframe. Not modified.
+    random : vivarium.framework.randomness.RandomnessStream
+        Module randomness stream used to draw who drinks. Falls back to numpy's global generator if not given.
+
+    Returns
+    -------
+    np.ndarray
+        Next monthly alcohol expenditure for each simulant.
+    """
+    # model is fitted on spending in units of £50. Rescale a copy so the caller's population is left alone.
+    current = current.assign(alcohol_spending=current['alcohol_spending'] // 50)
+    counts, zeros = predict_zip_parts(model, current)
     # draw randomly if a person drinks
-    # if they drink assign them their predicted value from count.
+    # if they drink draw their spending from a Poisson with their predicted count mean.
     # otherwise assign 0 (no spending).
-    preds = (np.random.uniform(size=zeros.shape) < zeros) * counts
+    preds = draw_zip(counts, zeros, current.index, random)
     # round up to nearest integer and times by 50 to get actual expenditure back.
     return np.ceil(preds) * 50
 
 
-def predict_next_timestep_tobacco_zip(model, current):
-    """ Get next state for alcohol monthly expenditure using zero inflated poisson models.
+def predict_next_timestep_tobacco_zip(model, current, random=None):
+    """ Get next state for number of cigarettes smoked using zero inflated poisson models.
 
     Parameters
     ----------
-    model: ??? what type is this?
+    model: R zeroinfl object
+        Fitted model loaded in from .rds file
     current: pd.DataFrame
         current population dataframe.
+    random : vivarium.framework.randomness.RandomnessStream
+        Module randomness stream used to draw who smokes. Falls back to numpy's global generator if not given.
+
     Returns
     -------
-
+    np.ndarray
+        Next number of cigarettes for each simulant.
     """
-    base = importr('base')
-    stats = importr('stats')
-    zeroinfl = importr("pscl")
-
-    # grab transition model
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        currentRDF = ro.conversion.py2rpy(current)
-
-    # grab count and zero prediction types
-    # count determines values if they actually drink
-    # zero determine probability of them not drinking
-    counts = stats.predict(model, currentRDF, type="count")
-    zeros = stats.predict(model, currentRDF, type="zero")
-
-
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        counts = ro.conversion.rpy2py(counts)
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        zeros = ro.conversion.rpy2py(zeros)
-
+    counts, zeros = predict_zip_parts(model, current)
     # draw randomly if a person smokes.
-    # if they drink assign them their predicted value from count.
+    # if they smoke draw their cigarettes from a Poisson with their predicted count mean.
     # otherwise assign 0 (no cigarettes).
-    preds = (np.random.uniform(size=zeros.shape) < zeros) * counts
-    # round up to nearest integer and times by 50 to get actual expenditure back.
+    preds = draw_zip(counts, zeros, current.index, random)
     return np.ceil(preds) * 5 #rescale back up to ncigs.
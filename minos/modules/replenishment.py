@@ -2,6 +2,9 @@
 
 import pandas as pd
 from minos.modules.base_module import Base
+from minos.modules.population_index import population_index
+from minos.modules.cohort_loader import load_cohort, INPUT_DATA_DIR
+from minos.modules.replenishment_store import ReplenishmentStore, REPLENISHING_POPULATION
 
 # suppressing a warning that isn't a problem
 pd.options.mode.chained_assignment = None # default='warn' #supress SettingWithCopyWarning
@@ -45,6 +48,8 @@ class Replenishment(Base):
             Vivarium's control object. Stores all simulation metadata and allows modules to use it.
         """
         self.current_year = builder.configuration.time.start.year
+        config = builder.configuration
+        self.input_data_dir = config.input_data_dir if 'input_data_dir' in config else INPUT_DATA_DIR
 
         # Define which columns are seen in builder.population.get_view calls.
         # Also defines which columns are created by on_initialize_simulants.
@@ -111,6 +116,11 @@ class Replenishment(Base):
         #                                                  value_columns=['count'])
 
 
+        # Replenishing cohorts by year. Opened once and each year's cohort read when it is added.
+        self.replenishing = ReplenishmentStore(
+            config.replenishing_population if 'replenishing_population' in config else REPLENISHING_POPULATION,
+            prefetch=config.replenishment_prefetch if 'replenishment_prefetch' in config else True)
+
         # Defines how this module initialises simulants when self.simulant_creater is called.
         builder.population.initializes_simulants(self.on_initialize_simulants,
                                                  creates_columns=view_columns)
@@ -142,7 +152,7 @@ class Replenishment(Base):
         if pop_data.user_data["sim_state"] == "setup":
             # Load in initial data frame.
             # Add entrance times and convert ages to floats for pd.timedelta to handle.
-            new_population = pd.read_csv(f"data/final_US/{self.current_year}_US_cohort.csv")
+            new_population = load_cohort(self.input_data_dir, self.current_year)
             new_population.loc[new_population.index, "entrance_time"] = new_population["time"]
             new_population.loc[new_population.index, "age"] = new_population["age"].astype(float)
         elif pop_data.user_data["cohort_type"] == "replenishment":
@@ -172,7 +182,18 @@ class Replenishment(Base):
         # Add new simulants to the overall population frame.
         self.register(new_population[["entrance_time", "age"]])
         self.population_view.update(new_population)
+        population_index.record(new_population)
+
+
+    def get_state(self):
+        """ Checkpoint the year of the last cohort added as well as the randomness key."""
+        state = super().get_state()
+        state['current_year'] = self.current_year
+        return state
 
+    def set_state(self, state):
+        super().set_state(state)
+        self.current_year = state['current_year']
 
     def on_time_step(self, event):
         """ On time step add new simulants to the module.
@@ -194,9 +215,8 @@ class Replenishment(Base):
             pop['time'] += 1
             self.population_view.update(pop)
             # Base year for the simulation is 2018, so we'll use this to select our replenishment pop
-            new_wave = pd.read_csv(f"data/replenishing/replenishing_pop_2019-2070.csv")
-            # Now select the population for the current year
-            new_wave = new_wave[(new_wave['time'] == event.time.year)]
+            # Only the current year's cohort is read from the replenishing population.
+            new_wave = self.replenishing.get(event.time.year)
             # TODO: Check how the population size changes over time now that we're only adding in 16 year olds
             # It might mean that the pop shrinks over time, as the counts within age groups is generally between 250-500
             # respondents (16-~80 year olds, older ages can have far less)
@@ -246,7 +266,7 @@ class Replenishment(Base):
             some time point at which to run the method.
         """
         # get alive people and add time in years to their age.
-        population = self.population_view.get(event.index, query="alive == 'alive'")
+        population = self.get_alive(event.index)
         population['age'] += event.step_size / pd.Timedelta(days=365.25)
         self.population_view.update(population)
 
@@ -261,7 +281,7 @@ class Replenishment(Base):
             some time point at which to run the method.
         """
         # get alive people and add time in years to their age.
-        population = self.population_view.get(event.index, query="alive == 'alive'")
+        population = self.get_alive(event.index)
         population['time'] += event.step_size / pd.Timedelta(days=365.25)
         self.population_view.update(population)
 
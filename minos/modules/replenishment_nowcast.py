@@ -4,6 +4,8 @@ File for adding new cohorts from Understanding Society data to the population
 
 import pandas as pd
 from minos.modules.base_module import Base
+from minos.modules.population_index import population_index
+from minos.modules.cohort_loader import load_cohort, INPUT_DATA_DIR
 
 
 # suppressing a warning that isn't a problem
@@ -46,6 +48,8 @@ class replenishmentNowcast(Base):
             Vivarium's control object. Stores all simulation metadata and allows modules to use it.
         """
         self.current_year = builder.configuration.time.start.year
+        config = builder.configuration
+        self.input_data_dir = config.input_data_dir if 'input_data_dir' in config else INPUT_DATA_DIR
 
         # Define which columns are seen in builder.population.get_view calls.
         # Also defines which columns are created by on_initialize_simulants.
@@ -132,7 +136,7 @@ class replenishmentNowcast(Base):
         if pop_data.user_data["sim_state"] == "setup":
             # Load in initial data frame.
             # Add entrance times and convert ages to floats for pd.timedelta to handle.
-            new_population = pd.read_csv(f"data/final_US/{self.current_year}_US_cohort.csv")
+            new_population = load_cohort(self.input_data_dir, self.current_year)
             new_population.loc[new_population.index, "entrance_time"] = new_population["time"]
             new_population.loc[new_population.index, "age"] = new_population["age"].astype(float)
         elif pop_data.user_data["cohort_type"] == "replenishment":
@@ -158,6 +162,17 @@ class replenishmentNowcast(Base):
         # Add new simulants to the overall population frame.
         self.register(new_population[["entrance_time", "age"]])
         self.population_view.update(new_population)
+        population_index.record(new_population)
+
+    def get_state(self):
+        """ Checkpoint the year of the last cohort added as well as the randomness key."""
+        state = super().get_state()
+        state['current_year'] = self.current_year
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.current_year = state['current_year']
 
     def on_time_step(self, event):
         """ On time step add new simulants to the module.
@@ -174,12 +189,12 @@ class replenishmentNowcast(Base):
             self.current_year += 1
             pop['time'] += 1
             self.population_view.update(pop)
-            new_wave = pd.read_csv(f"data/final_US/{self.current_year}_US_cohort.csv")
+            new_wave = load_cohort(self.input_data_dir, self.current_year)
         else:
             # otherwise dont load anyone in.
             new_wave = pd.DataFrame()
         # Get alive population.
-        pop = self.population_view.get(event.index, query='pidp > 0 and alive == "alive"')
+        pop = self.get_alive(event.index, query='pidp > 0')
         # Check new data has any simulants in it before adding to frame.
         if new_wave.shape[0] > 0:
             new_cohort = new_wave.loc[~new_wave["pidp"].isin(pop["pidp"])]
@@ -208,7 +223,7 @@ class replenishmentNowcast(Base):
             some time point at which to run the method.
         """
         # get alive people and add time in years to their age.
-        population = self.population_view.get(event.index, query="alive == 'alive'")
+        population = self.get_alive(event.index)
         population['age'] += event.step_size / pd.Timedelta(days=365.25)
         self.population_view.update(population)
 
@@ -220,6 +235,6 @@ class replenishmentNowcast(Base):
             some time point at which to run the method.
         """
         # get alive people and add time in years to their age.
-        population = self.population_view.get(event.index, query="alive == 'alive'")
+        population = self.get_alive(event.index)
         population['time'] += event.step_size / pd.Timedelta(days=365.25)
         self.population_view.update(population)
@@ -0,0 +1,145 @@
+"""
+Replenishing population partitioned by year.
+
+The replenishing population csv holds the cohorts for every year of a projection, but Replenishment only needs one
+year's cohort at a time. The csv is split once into one parquet file per year next to it
+(e.g. data/replenishing/replenishing_pop_2019-2070_by_year/2020.parquet). Later runs use the partitions directly until
+the csv changes. Each year's cohort is read on its own when it is needed and the next year can be read in the
+background while the current one is simulated.
+
+Partitions keep the csv's own column types. The population schema is applied to each cohort as it is read, so the
+partitions do not depend on population_schema in the config or on the schema at the time they were written.
+
+Without pyarrow the csv is parsed once per run and kept in memory split by year instead.
+"""
+
+import glob
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from minos.modules.population_schema import schema
+
+# Replenishing population used if the config has no replenishing_population.
+REPLENISHING_POPULATION = "data/replenishing/replenishing_pop_2019-2070.csv"
+
+# Written to the marker file. Change it when the partition layout changes so older partitions are rewritten.
+PARTITION_FORMAT = "untyped-1"
+
+
+class ReplenishmentStore:
+    """ Loads each year's replenishing cohort once from year partitions."""
+
+    def __init__(self, source=REPLENISHING_POPULATION, prefetch=True):
+        """
+        Parameters
+        ----------
+        source : str
+            Replenishing population csv with a time column giving each cohort's year.
+        prefetch : bool
+            Read the following year's cohort in the background whenever a cohort is taken.
+        """
+        self.source = source
+        self.prefetch = prefetch
+        self.frames = None
+        self.pending = {}
+        self.executor = None
+        try:
+            import pyarrow
+            self.path = self.partition(source)
+        except ImportError:
+            logging.warning("pyarrow is not installed so the replenishing population is kept in memory instead.")
+            self.path = None
+            table = pd.read_csv(source)
+            self.frames = {year: frame for year, frame in table.groupby('time')}
+
+    @staticmethod
+    def partition_path(source):
+        return os.path.splitext(source)[0] + "_by_year"
+
+    @staticmethod
+    def partition(source):
+        """ Split a replenishing population csv into one parquet file per year unless already split.
+
+        A marker file is written last, so partitions are only reused if a split in the current format finished after
+        the csv last changed.
+        Each file is written under a temporary name and moved into place so concurrent runs never read a partial file.
+
+        Parameters
+        ----------
+        source : str
+            Replenishing population csv.
+
+        Returns
+        -------
+        str
+            Directory of the partitions.
+        """
+        path = ReplenishmentStore.partition_path(source)
+        marker = os.path.join(path, "_complete")
+        if os.path.exists(marker) and os.path.getmtime(marker) >= os.path.getmtime(source):
+            with open(marker) as marker_file:
+                if marker_file.read() == PARTITION_FORMAT:
+                    return path
+
+        # Raises ImportError before anything is written if pyarrow is missing.
+        import pyarrow
+        logging.info(f"Partitioning {source} by year into {path}")
+        os.makedirs(path, exist_ok=True)
+        table = pd.read_csv(source)
+        for year, frame in table.groupby('time'):
+            year_path = os.path.join(path, f"{year}.parquet")
+            frame.to_parquet(year_path + ".tmp", compression='zstd')
+            os.replace(year_path + ".tmp", year_path)
+        with open(marker, 'w') as marker_file:
+            marker_file.write(PARTITION_FORMAT)
+        return path
+
+    def read(self, year):
+        """ Cohort of a year cast to the population schema. Empty if there is none for the year."""
+        if self.frames is not None:
+            frame = self.frames.get(year)
+            return schema.conform(frame.copy()) if frame is not None else pd.DataFrame()
+        year_path = os.path.join(self.path, f"{year}.parquet")
+        if not os.path.exists(year_path):
+            return pd.DataFrame()
+        return schema.conform(pd.read_parquet(year_path))
+
+    def years(self):
+        """ Years with a replenishing cohort."""
+        if self.frames is not None:
+            return sorted(self.frames)
+        files = glob.glob(os.path.join(self.path, "*.parquet"))
+        return sorted(int(os.path.splitext(os.path.basename(file))[0]) for file in files)
+
+    def get(self, year):
+        """ Replenishing cohort of a year.
+
+        Parameters
+        ----------
+        year : int
+            Cohort year.
+
+        Returns
+        -------
+        pd.DataFrame
+            The cohort. Empty if there is none for the year.
+        """
+        future = self.pending.pop(year, None)
+        cohort = future.result() if future is not None else self.read(year)
+        if self.prefetch and self.frames is None:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(1, thread_name_prefix="minos_replenishment")
+            self.pending[year + 1] = self.executor.submit(self.read, year + 1)
+        return cohort
+
+    def close(self):
+        """ Stop reading ahead. Cohorts still being read are finished and discarded."""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
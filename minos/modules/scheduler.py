@@ -0,0 +1,160 @@
+"""
+Concurrent scheduling of module time steps.
+
+Modules listening to the time step at the same priority run one after another in the order they were set up. Many
+of them (Housing, Labour, Neighbourhood, Alcohol, Tobacco etc.) only read columns none of the others write, so they
+could just as well run at the same time. The scheduler registers one time step listener per priority in place of
+the listeners of the modules given to it and splits each priority's modules into waves:
+
+- Modules are taken in their original order. A module joins the current wave unless it reads or writes a column
+  another module in the wave writes (or writes a column another reads). Otherwise it starts the next wave.
+- Modules within a wave run their on_time_step concurrently in a thread pool. Their population view updates are
+  held back until every module in the wave has finished and are then applied in the original module order.
+
+No module in a wave can see another's update and waves run in order, so results are the same as running every
+module one after another.
+"""
+
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+
+class DeferredView:
+    """ Population view that holds back updates so they can be applied later in a fixed order."""
+
+    def __init__(self, view):
+        self.view = view
+        self.updates = []
+
+    def get(self, *args, **kwargs):
+        return self.view.get(*args, **kwargs)
+
+    def update(self, pop):
+        self.updates.append(pop)
+
+    def __getattr__(self, name):
+        return getattr(self.view, name)
+
+
+class ScheduledModule:
+    """ A module with the population columns its time step reads and writes."""
+
+    def __init__(self, module, reads, writes):
+        self.module = module
+        self.reads = set(reads)
+        self.writes = set(writes)
+
+    def conflicts(self, other):
+        """ True if either module writes a column the other reads or writes."""
+        return bool(self.writes & (other.reads | other.writes) or other.writes & self.reads)
+
+    def check_update(self, pop):
+        """ Raise an error if an update writes columns this module did not declare."""
+        columns = {pop.name} if isinstance(pop, pd.Series) else set(pop.columns)
+        undeclared = columns - self.writes
+        if undeclared:
+            raise RuntimeError(f"{self.module} updated columns {sorted(undeclared)} it did not declare as written. "
+                               f"Add them to the writes passed to register_time_step.")
+
+
+class TimeStepScheduler:
+    """ Runs modules of the same time step priority concurrently where their columns do not overlap."""
+
+    def __init__(self, workers=2):
+        """
+        Parameters
+        ----------
+        workers : int
+            Number of threads running modules within a wave.
+        """
+        self.workers = workers
+        self.groups = {}
+        self.waves = {}
+        self.executor = None
+
+    def register(self, module, builder, priority, reads, writes):
+        """ Schedule a module's on_time_step instead of registering it as a listener itself.
+
+        The scheduler's listener for a priority is registered when its first module is, so it keeps that module's
+        place among any unscheduled listeners at the same priority.
+
+        Parameters
+        ----------
+        module : minos.modules.base_module.Base
+            Module to schedule.
+        builder : vivarium.builder
+            Builder passed to the module's setup.
+        priority : int
+            Time step listener priority of the module.
+        reads, writes : iterable
+            Population columns the module's time step reads and writes.
+        """
+        if priority not in self.groups:
+            self.groups[priority] = []
+            builder.event.register_listener("time_step", functools.partial(self.on_time_step, priority),
+                                            priority=priority)
+        self.groups[priority].append(ScheduledModule(module, reads, writes))
+        self.waves.pop(priority, None)
+
+    def get_waves(self, priority):
+        """ Split a priority's modules into consecutive waves of modules with no conflicting columns."""
+        if priority not in self.waves:
+            waves = []
+            for scheduled in self.groups[priority]:
+                if waves and not any(scheduled.conflicts(other) for other in waves[-1]):
+                    waves[-1].append(scheduled)
+                else:
+                    waves.append([scheduled])
+            self.waves[priority] = waves
+            logging.info(f"Time step priority {priority} waves: "
+                         f"{[[str(scheduled.module) for scheduled in wave] for wave in waves]}")
+        return self.waves[priority]
+
+    def on_time_step(self, priority, event):
+        """ Run every module scheduled at priority for one time step.
+
+        Parameters
+        ----------
+        priority : int
+            Listener priority being run.
+        event : vivarium.population.PopulationEvent
+            The event time_step that called this function.
+        """
+        for wave in self.get_waves(priority):
+            if len(wave) == 1 or self.workers < 2:
+                for scheduled in wave:
+                    scheduled.module.on_time_step(event)
+            else:
+                self.run_wave(wave, event)
+
+    def run_wave(self, wave, event):
+        """ Run a wave of modules concurrently and apply their updates in module order."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="minos_time_step")
+        views = [DeferredView(scheduled.module.population_view) for scheduled in wave]
+        for scheduled, view in zip(wave, views):
+            scheduled.module.population_view = view
+        try:
+            futures = [self.executor.submit(scheduled.module.on_time_step, event) for scheduled in wave]
+            # Wait for every module before raising so none is left running against a restored view.
+            exceptions = [future.exception() for future in futures]
+        finally:
+            for scheduled, view in zip(wave, views):
+                scheduled.module.population_view = view.view
+        for exception in exceptions:
+            if exception is not None:
+                raise exception
+
+        for scheduled, view in zip(wave, views):
+            for pop in view.updates:
+                scheduled.check_update(pop)
+                view.view.update(pop)
+
+    def close(self):
+        """ Shut down the thread pool."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
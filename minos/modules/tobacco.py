@@ -5,7 +5,6 @@ Possible extension to interaction with employment/education and any spatial/inte
 """
 
 import pandas as pd
-import minos.modules.r_utils as r_utils
 from minos.modules.base_module import Base
 import matplotlib.pyplot as plt
 from seaborn import histplot
@@ -44,7 +43,9 @@ class Tobacco(Base):
         #self.transition_coefficients = builder.
 
         # Assign randomness streams if necessary.
-        self.random = builder.randomness.get_stream("tobacco")
+        self.random = builder.randomness.get_stream(self.name)
+
+        self.transition_utils = self.get_transition_utils(builder.configuration)
 
         # Determine which subset of the main population is used in this module.
         # columns_created is the columns created by this module.
@@ -73,7 +74,7 @@ class Tobacco(Base):
 
         # Declare events in the module. At what times do individuals transition states from this module. E.g. when does
         # individual graduate in an education module.
-        builder.event.register_listener("time_step", self.on_time_step, priority=3)
+        self.register_time_step(builder, priority=3, writes=["ncigs"])
 
     def on_time_step(self, event):
         """Produces new children and updates parent status on time steps.
@@ -84,12 +85,12 @@ class Tobacco(Base):
             The event time_step that called this function.
         """
         # Get living people to update their tobacco
-        pop = self.population_view.get(event.index, query="alive =='alive'")
+        pop = self.get_alive(event.index)
         self.year = event.time.year
 
         ## Predict next tobacco value
         newWaveTobacco = self.calculate_tobacco(pop)
-        newWaveTobacco = pd.DataFrame(newWaveTobacco, columns=["ncigs"])
+        newWaveTobacco = pd.DataFrame({"ncigs": newWaveTobacco}, index=pop.index)
         # Set index type to int (instead of object as previous)
         newWaveTobacco.index = newWaveTobacco.index.astype(int)
 
@@ -110,9 +111,9 @@ class Tobacco(Base):
         # load transition model based on year.
         year = max(self.year, 2014)
         year = min(year, 2018)
-        transition_model = r_utils.load_transitions(f"tobacco/zip/tobacco_zip_{year}_{year + 1}")
-        # The calculation relies on the R predict method and the model that has already been specified
-        nextWaveTobacco = r_utils.predict_next_timestep_tobacco_zip(transition_model, pop)
+        transition_model = self.transition_utils.load_transitions(f"tobacco/zip/tobacco_zip_{year}_{year + 1}")
+        # The calculation uses the predict method of the chosen backend and the model that has already been specified
+        nextWaveTobacco = self.transition_utils.predict_next_timestep_tobacco_zip(transition_model, pop, self.random)
         return nextWaveTobacco
 
     def plot(self, pop, config):
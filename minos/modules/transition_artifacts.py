@@ -0,0 +1,190 @@
+"""
+Compiled transition model artifacts.
+
+Exported .json transition models (see minos/transitions/export_transitions.R) are compiled into two files:
+
+- <model>.npy holds every coefficient array of the model concatenated into one float64 block. It is memory mapped
+  when loaded so opening a model does not copy its coefficients.
+- <model>.manifest.json holds the format version, model family, sha256 of the source .rds file, the population
+  columns (covariates) the model needs and the model specification with each array replaced by its offset and shape
+  within the .npy block.
+
+Run as a script to compile every exported model in a transitions directory:
+python minos/modules/transition_artifacts.py data/transitions/
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Increase whenever the manifest or coefficient block layout changes.
+FORMAT_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+BLOCK_SUFFIX = ".npy"
+# Specification keys holding numeric arrays and the minimum number of dimensions of each.
+ARRAY_KEYS = {'intercept': 1, 'thresholds': 1, 'coefficients': 2}
+
+
+def file_sha256(filename):
+    """ sha256 hex digest of a file, or None if it does not exist."""
+    if not os.path.exists(filename):
+        return None
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as source:
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pack_arrays(node, blocks, offset):
+    """ Replace numeric arrays in a model specification with references into a single coefficient block.
+
+    Parameters
+    ----------
+    node : dict or list
+        Part of an exported model specification. Modified in place.
+    blocks : list
+        Flattened arrays in block order. Appended to.
+    offset : int
+        Position in the block the next array starts at.
+
+    Returns
+    -------
+    int
+        Offset after any arrays packed from node.
+    """
+    if isinstance(node, list):
+        for item in node:
+            offset = pack_arrays(item, blocks, offset)
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            if key in ARRAY_KEYS and not isinstance(value, dict):
+                array = np.asarray(value, dtype=np.float64)
+                array = np.atleast_2d(array) if ARRAY_KEYS[key] == 2 else np.atleast_1d(array)
+                blocks.append(array.ravel())
+                node[key] = {'offset': offset, 'shape': list(array.shape)}
+                offset += array.size
+            else:
+                offset = pack_arrays(value, blocks, offset)
+    return offset
+
+
+def unpack_arrays(node, block):
+    """ Replace block references in a manifest specification with views of the coefficient block. In place."""
+    if isinstance(node, list):
+        for item in node:
+            unpack_arrays(item, block)
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            if key in ARRAY_KEYS and isinstance(value, dict):
+                size = int(np.prod(value['shape']))
+                node[key] = block[value['offset']:value['offset'] + size].reshape(value['shape'])
+            else:
+                unpack_arrays(value, block)
+
+
+def find_covariates(node, covariates=None):
+    """ Population columns used by any term of a model specification, in order of first use."""
+    if covariates is None:
+        covariates = []
+    if isinstance(node, list):
+        for item in node:
+            find_covariates(item, covariates)
+    elif isinstance(node, dict):
+        if 'column' in node and node['column'] not in covariates:
+            covariates.append(node['column'])
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                find_covariates(value, covariates)
+    return covariates
+
+
+def compile_model(spec_file):
+    """ Compile one exported .json model into a coefficient block and manifest next to it.
+
+    Parameters
+    ----------
+    spec_file : str
+        Path to an exported <model>.json file.
+
+    Returns
+    -------
+    str
+        Path to the written manifest.
+    """
+    stem = spec_file[:-len(".json")]
+    with open(spec_file) as source:
+        spec = json.load(source)
+
+    blocks = []
+    pack_arrays(spec, blocks, 0)
+    block = np.concatenate(blocks) if blocks else np.empty(0, dtype=np.float64)
+
+    manifest = {'format_version': FORMAT_VERSION,
+                'family': spec['family'],
+                'source': spec.get('source'),
+                'source_sha256': file_sha256(f"{stem}.rds"),
+                'covariates': find_covariates(spec),
+                'spec': spec}
+    np.save(stem + BLOCK_SUFFIX, block)
+    with open(stem + MANIFEST_SUFFIX, 'w') as out:
+        json.dump(manifest, out, indent=1)
+    return stem + MANIFEST_SUFFIX
+
+
+def read_compiled_model(manifest_file):
+    """ Load a compiled model. Coefficient arrays are read only views of the memory mapped block.
+
+    Parameters
+    ----------
+    manifest_file : str
+        Path to a <model>.manifest.json file.
+
+    Returns
+    -------
+    dict
+        Model specification in the same form as native_utils.read_model_spec, plus a 'manifest' entry.
+
+    Raises
+    ------
+    ValueError
+        If the artifact was compiled with a different format version.
+    """
+    with open(manifest_file) as source:
+        manifest = json.load(source)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{manifest_file} has format version {manifest.get('format_version')} but version "
+                         f"{FORMAT_VERSION} is required. Recompile with `make compiled_transitions`.")
+
+    stem = manifest_file[:-len(MANIFEST_SUFFIX)]
+    block = np.load(stem + BLOCK_SUFFIX, mmap_mode='r')
+    spec = manifest.pop('spec')
+    unpack_arrays(spec, block)
+    spec['manifest'] = manifest
+    return spec
+
+
+def compile_directory(path):
+    """ Compile every exported .json model found under path. Returns the written manifest paths."""
+    spec_files = sorted(glob.glob(os.path.join(path, '**', '*.json'), recursive=True))
+    spec_files = [file for file in spec_files if not file.endswith(MANIFEST_SUFFIX)]
+    manifests = []
+    for spec_file in spec_files:
+        manifests.append(compile_model(spec_file))
+        print(f"Compiled {spec_file}")
+    return manifests
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compile exported transition models into memory mapped artifacts.")
+    parser.add_argument('path', nargs='?', default='data/transitions/',
+                        help='Transition model directory, or one exported .json model.')
+    args = parser.parse_args()
+    if os.path.isfile(args.path):
+        compile_model(args.path)
+    else:
+        compile_directory(args.path)
@@ -0,0 +1,171 @@
+"""
+Transition predictions over unique covariate profiles.
+
+Many transition models only use categorical covariates (sex, ethnicity, region, job_sec, labour_state etc.) so large
+numbers of simulants share exactly the same covariate values. Predictions are deterministic given those values, so
+each distinct row (profile) only needs predicting once. Rows are grouped by profile, one representative row per
+profile is predicted and the results are copied back to every simulant with that profile.
+
+Random draws are still made per simulant from the scattered predictions, so results are unchanged.
+"""
+
+import functools
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Profiles are only predicted if there are at most this fraction as many profiles as rows. Otherwise (e.g. models
+# using income or age) the population is predicted as it is.
+MAX_UNIQUE_FRACTION = 0.5
+
+
+class ProfileStats:
+    """ Rows and unique profiles seen by each deduplicated prediction function."""
+
+    def __init__(self):
+        # Set to False to always predict every row. RunPipeline sets this from unique_profiles in the config.
+        self.enabled = True
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, rows, profiles):
+        """ Add one prediction of rows simulants with profiles distinct covariate rows."""
+        with self._lock:
+            calls, total_rows, total_profiles = self.counts.get(name, (0, 0, 0))
+            self.counts[name] = (calls + 1, total_rows + rows, total_profiles + profiles)
+        logging.debug(f"{name}: {rows} rows, {profiles} unique profiles ({rows / max(profiles, 1):.1f}x).")
+
+    def clear(self):
+        """ Reset all counts."""
+        self.counts = {}
+
+    def stats(self):
+        """ Summary of deduplication.
+
+        Returns
+        -------
+        dict
+            Total rows, unique profiles and compression ratio (rows per profile) overall and for each function.
+        """
+        summary = {}
+        for name, (calls, rows, profiles) in self.counts.items():
+            summary[name] = {'calls': calls,
+                             'rows': rows,
+                             'profiles': profiles,
+                             'compression': round(rows / max(profiles, 1), 2)}
+        rows = sum(entry['rows'] for entry in summary.values())
+        profiles = sum(entry['profiles'] for entry in summary.values())
+        summary['total'] = {'rows': rows, 'profiles': profiles, 'compression': round(rows / max(profiles, 1), 2)}
+        return summary
+
+
+# Counts shared by every module in the process.
+profiles = ProfileStats()
+
+
+def profile_codes(covariates):
+    """ Group rows of a frame by their values.
+
+    Each column is factorised and the codes combined into one integer key per row, so no row tuples are hashed.
+    Missing values form their own group.
+
+    Parameters
+    ----------
+    covariates : pd.DataFrame
+        Columns to group rows by.
+
+    Returns
+    -------
+    inverse : np.ndarray
+        Profile number of each row.
+    first : np.ndarray
+        Position of one row with each profile.
+    """
+    n = covariates.shape[0]
+    key = np.zeros(n, dtype=np.int64)
+    radix = 1
+    for column in covariates.columns:
+        codes, uniques = pd.factorize(covariates[column])
+        size = len(uniques) + 1
+        if radix * size >= 2 ** 62:
+            # Renumber the profiles so far before the combined key could overflow.
+            key = pd.factorize(key)[0].astype(np.int64)
+            radix = int(key.max()) + 1
+        key += (codes.astype(np.int64) + 1) * radix
+        radix *= size
+    inverse, uniques = pd.factorize(key)
+    first = np.empty(len(uniques), dtype=np.intp)
+    # Rows sharing a profile have identical covariates so any one of them can represent it.
+    first[inverse] = np.arange(n)
+    return inverse, first
+
+
+def has_continuous(covariates):
+    """ Whether any covariate has fractional values (e.g. income). Such rows are almost all unique so are not grouped.
+
+    Checking is much cheaper than factorising every column only to find too many profiles.
+    """
+    for column in covariates.columns:
+        values = covariates[column]
+        if pd.api.types.is_float_dtype(values.dtype):
+            numbers = values.to_numpy()
+            if np.any(np.mod(numbers[~np.isnan(numbers)], 1) != 0):
+                return True
+    return False
+
+
+def scatter(result, inverse, index):
+    """ Copy per profile predictions back to every row. Handles frames, series, arrays and tuples of them."""
+    if isinstance(result, tuple):
+        return tuple(scatter(part, inverse, index) for part in result)
+    if isinstance(result, pd.DataFrame):
+        return pd.DataFrame(result.to_numpy()[inverse], index=index, columns=result.columns)
+    if isinstance(result, pd.Series):
+        return pd.Series(result.to_numpy()[inverse], index=index, name=result.name)
+    return np.asarray(result)[inverse]
+
+
+def by_profile(columns, context=None):
+    """ Decorator predicting a transition model once per unique covariate profile.
+
+    Parameters
+    ----------
+    columns : callable
+        Takes the model and population and returns the population columns the model uses, or None if rows cannot
+        be predicted independently (e.g. a covariate is scaled by statistics of the whole population).
+    context : callable
+        Optional context manager factory entered around the prediction of the unique profiles.
+
+    Returns
+    -------
+    callable
+        Decorator for predict functions taking the model and population as their first two arguments.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(model, current, *args, **kwargs):
+            covariates = columns(model, current) if profiles.enabled and len(current) > 0 else None
+            if covariates is None:
+                return function(model, current, *args, **kwargs)
+
+            if has_continuous(current[covariates]):
+                profiles.record(function.__name__, len(current), len(current))
+                return function(model, current, *args, **kwargs)
+            inverse, first = profile_codes(current[covariates])
+            if len(first) > MAX_UNIQUE_FRACTION * len(current):
+                # Predicted row by row so no rows are saved.
+                profiles.record(function.__name__, len(current), len(current))
+                return function(model, current, *args, **kwargs)
+            profiles.record(function.__name__, len(current), len(first))
+
+            unique = current[covariates].iloc[first]
+            if context is None:
+                result = function(model, unique, *args, **kwargs)
+            else:
+                with context():
+                    result = function(model, unique, *args, **kwargs)
+            return scatter(result, inverse, current.index)
+        return wrapper
+    return decorator
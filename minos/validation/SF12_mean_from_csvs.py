@@ -3,13 +3,15 @@ import pandas as pd
 import numpy as np
 import itertools
 
+from minos.minosPipeline.output_files import find_output_files, read_output
+
 
 def get_SF12_mean(file_names, year, source):
 
     means = []
     for file in file_names:
         #print(file)
-        data = pd.read_csv(file)
+        data = read_output(file, columns=['SF_12'])
         mean = np.nanmean(data['SF_12'])
         #print(mean)
         means.append(mean)
@@ -25,7 +27,7 @@ def main(sources, years):
 
     for source in sources:
         for year in years:
-            file_names = glob.glob(f"{source}/*{year}.csv")
+            file_names = find_output_files(source, year)
             print(file_names)
             get_SF12_mean(file_names, year, source)
 
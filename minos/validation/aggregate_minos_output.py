@@ -5,6 +5,7 @@ import argparse
 import os
 import yaml
 from aggregate_subset_functions import find_subset_function
+from minos.minosPipeline.output_files import find_output_files, read_output
 
 def aggregate_variables_by_year(source, years, tag, v, method, subset_func):
     """ Get aggregate values for value v using method function. Do this over the specified source and years.
@@ -45,9 +46,9 @@ def aggregate_variables_by_year(source, years, tag, v, method, subset_func):
 
     df = pd.DataFrame(columns = ["year", "tag", v]) # keep year, tag and columns specified by user v.
     for year in years:
-        files = glob.glob(os.path.join(source, f"*{year}.csv")) # grab all files at source with suffix year.csv.
+        files = find_output_files(source, year) # grab all output files at source for year.
         for file in files: # loop over files. take aggregate value of v and add it as a row to output df.
-            new_df = pd.read_csv(file, low_memory=False)
+            new_df = read_output(file)
             if subset_func:
                 new_df = subset_func(new_df)
             agg_var = new_df[v]
@@ -4,6 +4,9 @@ import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from minos.minosPipeline.output_files import find_output_files, read_output
+from minos.minosPipeline.panel_store import PanelStore, find_panels
+
 # DEPRECATED.
 # DEPRECATED.
 # DEPRECATED.
@@ -49,10 +52,14 @@ def aggregate_variables_by_year(source, years, label, v, agger):
     """
 
     df = pd.DataFrame(columns = ["year", "label", v]) # keep year, label and columns specified by user v.
+    panels = [PanelStore(panel) for panel in find_panels(source)] # runs written as panel stores.
     for year in years:
-        files = glob.glob(f"{source}*{year}.csv") # grab all files at source with suffix year.csv.
-        for file in files:
-            agg_value = agger(pd.read_csv(file, low_memory=False)[v])
+        files = find_output_files(source, year) # grab all output files at source for year.
+        values = [read_output(file, columns=[v])[v] for file in files]
+        # panel stores read only column v for the year directly.
+        values += [panel.year_slice(year, columns=[v])[v] for panel in panels if year in panel.years()]
+        for value in values:
+            agg_value = agger(value)
             new_df = pd.DataFrame([[agg_value, label, year]], columns = [v, 'label', 'year'])
             df = pd.concat([df, new_df])
     return df
@@ -9,6 +9,7 @@ import argparse
 import glob
 import os
 from aggregate_subset_functions import find_subset_function
+from minos.minosPipeline.output_files import find_output_files, read_output
 def eightyTwenty(income):
 
     split = pd.qcut(income, q=5, labels=[1, 2, 3, 4, 5])
@@ -28,10 +29,10 @@ def group_minos_by_pidp(source, year, v, method, subset_func):
     -------
 
     """
-    files = glob.glob(source + f"/*{year}.csv")
+    files = find_output_files(source, year)
     df = pd.DataFrame()
     for file in files:
-        df = pd.concat([df, pd.read_csv(file, low_memory=True)])
+        df = pd.concat([df, read_output(file)])
     if subset_func:
         df = subset_func(df)
     df = df.groupby(['pidp']).apply(lambda x: method(x[v]))
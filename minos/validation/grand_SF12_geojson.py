@@ -8,6 +8,8 @@ from collections import defaultdict
 import numpy as np
 import sys
 
+from minos.minosPipeline.output_files import find_output_files, read_output
+
 def get_files(source, year, params, param_names):
     """
 
@@ -27,12 +29,12 @@ def get_files(source, year, params, param_names):
         List of file names to pull csvs from.
     """
 
-    search_string = source
+    pattern = ''
     for p, n in zip(params, param_names):
-        search_string += n + "_" + str(p) + '_'
-    search_string += f'*{year}.csv'
-    print(search_string)
-    files = glob.glob(search_string)
+        pattern += n + "_" + str(p) + '_'
+    pattern += '*'
+    print(source + pattern + str(year))
+    files = find_output_files(source, year, pattern)
     return files
 
 def main(source, spatial_source, year, params, param_names):
@@ -57,7 +59,7 @@ def main(source, spatial_source, year, params, param_names):
     print(file_names)
     US_data = pd.DataFrame()
     for file in file_names:
-        US_data = pd.concat([US_data, pd.read_csv(file)], ignore_index=True)
+        US_data = pd.concat([US_data, read_output(file)], ignore_index=True)
 
     print(US_data.shape)
     # subset US data. grab common pidps to prevent NA errors.
@@ -0,0 +1,152 @@
+"""
+Check native transition model predictions against R.
+
+Every exported .json model found in the transitions directory (or those given with --components) is predicted for a
+population file with both native_utils and r_utils and the largest absolute difference is reported.
+Use this after `make native_transitions` to confirm the native backend reproduces the R models. Compiled artifacts
+are checked instead of the exported .json where they exist.
+
+Example
+-------
+python minos/validation/transition_parity.py -d data/final_US/2018_US_cohort.csv
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from minos.modules import native_utils
+from minos.modules import r_utils
+from minos.modules import transition_artifacts
+
+
+def compare_ols(component, data, path):
+    """ Predict an OLS model with both backends.
+
+    Parameters
+    ----------
+    component : str
+        Model file name relative to path without extension. E.g. hh_income/hh_income_2018_2019
+    data : pd.DataFrame
+        Population to predict for.
+    path : str
+        Transitions directory.
+
+    Returns
+    -------
+    tuple
+        R and native predictions as numpy arrays.
+    """
+    r_model = r_utils.load_transitions(component, path)
+    native_model = native_utils.load_transitions(component, path)
+    r_prediction = r_utils.predict_next_timestep_ols(r_model, data, 'prediction')
+    native_prediction = native_utils.predict_next_timestep_ols(native_model, data, 'prediction')
+    return r_prediction.to_numpy(dtype=float), native_prediction.to_numpy(dtype=float)
+
+
+def compare_clm(component, data, path):
+    """ Predict state probabilities from a clm model with both backends. See compare_ols."""
+    r_model = r_utils.load_transitions(component, path)
+    native_model = native_utils.load_transitions(component, path)
+    r_prediction = r_utils.predict_next_timestep_clm(r_model, data)
+    native_prediction = native_utils.predict_next_timestep_clm(native_model, data)
+    return r_prediction.to_numpy(dtype=float), native_prediction.to_numpy(dtype=float)
+
+
+def compare_multinom(component, data, path):
+    """ Predict class probabilities from a nnet multinom model with both backends. See compare_ols."""
+    r_model = r_utils.load_transitions(component, path)
+    native_model = native_utils.load_transitions(component, path)
+    r_prediction = r_utils.predict_next_timestep_labour_nnet(r_model, data)
+    native_prediction = native_utils.predict_next_timestep_multinom(native_model, data)
+    if list(r_prediction.columns) != list(native_prediction.columns):
+        raise ValueError(f"{component}: class levels differ. R {list(r_prediction.columns)}, "
+                         f"native {list(native_prediction.columns)}.")
+    return r_prediction.to_numpy(dtype=float), native_prediction.to_numpy(dtype=float)
+
+
+def compare_zeroinfl(component, data, path):
+    """ Predict count means and zero probabilities from a pscl zeroinfl model with both backends.
+
+    Only the deterministic predictions are compared. Draws depend on the randomness stream. See compare_ols.
+    """
+    r_model = r_utils.load_transitions(component, path)
+    native_model = native_utils.load_transitions(component, path)
+    r_prediction = np.column_stack(r_utils.predict_zip_parts(r_model, data))
+    native_prediction = np.column_stack(native_utils.predict_zip_parts(native_model, data))
+    return r_prediction, native_prediction
+
+
+# Comparison function for each exported model family.
+comparisons = {'ols': compare_ols,
+               'clm': compare_clm,
+               'multinom': compare_multinom,
+               'zeroinfl': compare_zeroinfl}
+
+
+def check_parity(component, data, path, tolerance):
+    """ Compare R and native predictions for one transition model.
+
+    Parameters
+    ----------
+    component : str
+        Model file name relative to path without extension.
+    data : pd.DataFrame
+        Population to predict for.
+    path : str
+        Transitions directory.
+    tolerance : float
+        Largest absolute difference allowed.
+
+    Returns
+    -------
+    bool
+        True if both backends agree on missing values and all other predictions are within tolerance.
+    """
+    family = native_utils.load_transitions(component, path)['family']
+    if family not in comparisons:
+        print(f"{component}: no parity check for model family {family}. Skipping.")
+        return True
+
+    r_prediction, native_prediction = comparisons[family](component, data, path)
+    r_missing = np.isnan(r_prediction)
+    native_missing = np.isnan(native_prediction)
+    missing_match = np.array_equal(r_missing, native_missing)
+    present = ~(r_missing | native_missing)
+    max_difference = np.max(np.abs(r_prediction[present] - native_prediction[present]), initial=0)
+    passed = missing_match and max_difference <= tolerance
+    print(f"{component} ({family}): max absolute difference {max_difference:.3g}, "
+          f"missing values match: {missing_match}. {'PASS' if passed else 'FAIL'}")
+    return passed
+
+
+def find_components(path):
+    """ Names of all exported models in the transitions directory, relative to it and without extension."""
+    files = sorted(glob.glob(os.path.join(path, '**', '*.json'), recursive=True))
+    files = [file for file in files if not file.endswith(transition_artifacts.MANIFEST_SUFFIX)]
+    return [os.path.splitext(os.path.relpath(file, path))[0] for file in files]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check native transition model predictions against R.")
+    parser.add_argument('-d', '--data', required=True, type=str,
+                        help='Population csv to predict for. E.g. data/final_US/2018_US_cohort.csv')
+    parser.add_argument('-p', '--path', default='data/transitions/', type=str,
+                        help='Transition model directory.')
+    parser.add_argument('-c', '--components', nargs='*', default=None,
+                        help='Models to check relative to path, e.g. hh_income/hh_income_2018_2019. Defaults to all.')
+    parser.add_argument('-t', '--tolerance', default=1e-8, type=float,
+                        help='Largest absolute difference allowed between R and native predictions.')
+    args = parser.parse_args()
+
+    path = os.path.join(args.path, '')
+    components = args.components or find_components(path)
+    data = pd.read_csv(args.data, low_memory=False)
+
+    results = [check_parity(component, data, path, args.tolerance) for component in components]
+    if not all(results):
+        raise SystemExit(f"{results.count(False)} of {len(results)} transition models differ between R and native.")
+    print(f"All {len(results)} transition models match.")
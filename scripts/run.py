@@ -9,8 +9,13 @@ import argparse
 import yaml
 import logging
 import datetime
+import multiprocessing
+
+import numpy as np
 
 from minos.minosPipeline.RunPipeline import RunPipeline
+from minos.modules import input_cache
+from minos.modules.cohort_loader import cohort_size, load_cohort
 
 
 def run(args):
@@ -50,8 +55,8 @@ def run(args):
     ## Define some initial vars that vivarium needs
     # start year
     year_start = config['time']['start']['year']
-    # start_population_size (use size of prepared input population in start year)
-    start_population_size = pd.read_csv(f"{config['input_data_dir']}/{year_start}_US_cohort.csv").shape[0]
+    # start_population_size (use size of prepared input population in start year, from its metadata if written)
+    start_population_size = cohort_size(config['input_data_dir'], year_start)
     print(f'Start Population Size: {start_population_size}')
 
 
@@ -104,6 +109,11 @@ def run(args):
             'experiment_parameters_names': 'run_id'
         }, source=str(Path(__file__).resolve()))
 
+    # Replicates run from one command are each given their own random seed.
+    if args.seed is not None:
+        add_to_config.update({'randomness': {'random_seed': args.seed}})
+        np.random.seed(args.seed)
+
     # Now update the Vivarium ConfigTree object
     config.update(add_to_config)
 
@@ -147,6 +157,14 @@ def run(args):
     logging.info(f"Beginning a {scenario} simulation.")
     if args.runID:
         logging.info(f"This is run {args.runID} of a batch run.")
+    if args.seed is not None:
+        logging.info(f"Random seed: {args.seed}")
+    if args.resume:
+        logging.info("Resuming from the latest checkpoint if there is one.")
+    if args.warm_up is not None:
+        logging.info(f"Warm up run for {args.warm_up} years.")
+    if args.fork_from:
+        logging.info(f"Forking from the warm start in {args.fork_from}")
     logging.info(f"Beginning simulation in {config.time.start.year}, running for {config.time.num_years} years until {config.time.end.year}")
     logging.info("Pipeline start...")
     #TODO: Add more here.
@@ -154,15 +172,125 @@ def run(args):
     ############## RUN PIPELINE ##############
     # Different call for intervention or not
     if args.intervention:
-        simulation = RunPipeline(config, run_output_dir, intervention=args.intervention)
+        simulation = RunPipeline(config, run_output_dir, intervention=args.intervention, resume=args.resume,
+                                 warm_up=args.warm_up, fork_from=args.fork_from)
     else:
-        simulation = RunPipeline(config, run_output_dir)
+        simulation = RunPipeline(config, run_output_dir, resume=args.resume, warm_up=args.warm_up,
+                                 fork_from=args.fork_from)
 
     print('Finished running the full simulation')
 
     #return simulation
 
 
+def preload_inputs(config):
+    """ Read the inputs every replicate uses before replicate processes are forked.
+
+    Replicates are forked from this process so they share the parsed cohort, rate tables and transition models
+    copy-on-write rather than each reading them again. Rate tables are also built here if they have not been cached
+    yet so replicates do not all build and write them at once.
+
+    Parameters
+    ----------
+    config : vivarium.config_tree.ConfigTree
+        Model config.
+    """
+    from minos.modules.mortality import Mortality
+    from minos.modules.add_new_birth_cohorts import FertilityAgeSpecificRates
+    from minos.modules import native_utils
+    from minos.modules.replenishment_store import ReplenishmentStore, REPLENISHING_POPULATION
+
+    year_start = config.time.start.year
+    load_cohort(config.input_data_dir, year_start, copy=False)
+    for component in [Mortality, FertilityAgeSpecificRates]:
+        if f"{component.__name__}()" in config.components:
+            rate_table = component.load_rate_table(config)
+            input_cache.read_csv(rate_table.rate_table_path, copy=False, index_col=[0])
+    # Split the replenishing population by year once rather than in every replicate.
+    if "Replenishment()" in config.components:
+        try:
+            ReplenishmentStore.partition(config.replenishing_population if 'replenishing_population' in config
+                                         else REPLENISHING_POPULATION)
+        except ImportError:
+            pass
+    # R models cannot be shared between processes. Each replicate starts its own R session if the R backend is used.
+    if 'transition_backend' not in config or config.transition_backend == 'native':
+        loaded = native_utils.preload_transitions()
+        print(f"Preloaded {loaded} transition models.")
+
+
+def run_replicates(args):
+    """ Run several replicates of the same simulation in a pool of local processes.
+
+    Each replicate is an ordinary run with its own run ID (1 to N, or starting from --run_id) and random seed. All
+    replicates write to the same output directory in the batch run layout used by arc_submit.sh.
+
+    Parameters
+    ----------
+    args : ArgumentParser.Namespace
+       Command line arguments of parameters for the model run
+    """
+    config = utils.read_config(args.config)
+    preload_inputs(config)
+
+    # Keep every replicate's output together under one runtime directory.
+    runtime = args.runtime or str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S"))
+    first_run_id = args.runID or 1
+    # Independent seeds for each replicate. Reproducible if --seed is given.
+    seeds = [int(seed.generate_state(1)[0]) for seed in np.random.SeedSequence(args.seed).spawn(args.replicates)]
+    replicate_args = [argparse.Namespace(**{**vars(args),
+                                            'runID': first_run_id + i,
+                                            'runtime': runtime,
+                                            'seed': seed})
+                      for i, seed in enumerate(seeds)]
+
+    print(f"Running {args.replicates} replicates with {args.workers} workers.")
+    # Fork so workers inherit the preloaded inputs. One replicate per worker process keeps replicates independent.
+    context = multiprocessing.get_context('fork')
+    with context.Pool(args.workers, maxtasksperchild=1) as pool:
+        pool.map(run, replicate_args, chunksize=1)
+    print(f"Finished running {args.replicates} replicates.")
+
+
+def run_scenarios(args):
+    """ Run several scenarios from one shared warm start in a pool of local processes.
+
+    The baseline is simulated once for the first --fork_year years and saved as a warm start. Every scenario, the
+    baseline included, then forks from it and simulates the remaining years alongside the others. Setup inputs are
+    preloaded and shared copy-on-write as for replicates. Interventions start in the fork year.
+
+    Parameters
+    ----------
+    args : ArgumentParser.Namespace
+       Command line arguments of parameters for the model run
+    """
+    config = utils.read_config(args.config)
+    preload_inputs(config)
+
+    # Every scenario writes under the same runtime so they can find the baseline's warm start.
+    runtime = args.runtime or str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S"))
+    baseline_dir = os.path.join(config['output_data_dir'], args.subdir or '', 'baseline', runtime)
+    common_args = {**vars(args), 'runtime': runtime, 'replicates': None, 'scenarios': None}
+
+    print(f"Running baseline warm up for {args.fork_year} years.")
+    context = multiprocessing.get_context('fork')
+    # The warm up runs in its own process as well so scenarios are forked from a parent without a simulation.
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        pool.apply(run, (argparse.Namespace(**{**common_args, 'intervention': None, 'warm_up': args.fork_year,
+                                                'fork_from': None}),))
+
+    scenarios = args.scenarios.split(',')
+    scenario_args = [argparse.Namespace(**{**common_args,
+                                           'intervention': None if scenario == 'baseline' else scenario,
+                                           'warm_up': None,
+                                           'fork_from': baseline_dir})
+                     for scenario in scenarios]
+    print(f"Running scenarios {scenarios} from the warm start with {args.workers} workers.")
+    with context.Pool(args.workers, maxtasksperchild=1) as pool:
+        pool.map(run, scenario_args, chunksize=1)
+    print(f"Finished running {len(scenarios)} scenarios.")
+
+
 # This __main__ function is used to run this script in a console. See daedalus github for examples.
 if __name__ == "__main__":
 
@@ -192,7 +320,37 @@ if __name__ == "__main__":
        - livingWageIntervention
        - energyDownlift""")
 
+    parser.add_argument("-n", "--replicates", type=int, metavar="replicates", dest="replicates", default=None,
+                        help="(Optional) Number of replicate runs to run in local processes. Each gets its own run ID and seed.")
+    parser.add_argument("-w", "--workers", type=int, metavar="workers", dest="workers", default=1,
+                        help="(Optional) Number of replicates run at once with --replicates.")
+    parser.add_argument("-s", "--seed", type=int, metavar="seed", dest="seed", default=None,
+                        help="(Optional) Random seed. With --replicates, seeds for each replicate are derived from it.")
+
+    parser.add_argument("--resume", action="store_true", dest="resume", default=False,
+                        help="(Optional) Carry on from the latest checkpoint of the run. Give the same -t runtime (and -o, -i, -r) as the stopped run.")
+
+    parser.add_argument("--warm_up", type=int, metavar="years", dest="warm_up", default=None,
+                        help="(Optional) Only simulate this many years and save them as a warm start for --fork_from.")
+    parser.add_argument("--fork_from", type=str, metavar="directory", dest="fork_from", default=None,
+                        help="(Optional) Output directory of a --warm_up run. Carry on from its warm start.")
+    parser.add_argument("--scenarios", type=str, metavar="scenarios", dest="scenarios", default=None,
+                        help=
+    """(Optional) Comma separated scenarios (baseline and/or interventions) to fork from one baseline warm start of
+       --fork_year years and run with --workers processes. E.g. baseline,livingWageIntervention,energyDownlift""")
+    parser.add_argument("--fork_year", type=int, metavar="years", dest="fork_year", default=None,
+                        help="Years simulated as baseline before --scenarios fork. Required with --scenarios. Interventions start after them.")
+
     args = parser.parse_args()
     configuration_file = args.config
 
-    run(args)
+    if args.scenarios:
+        # A warm start of 0 years would fork every scenario from the starting population, just slower.
+        if args.fork_year is None or args.fork_year < 1:
+            parser.error("--scenarios needs --fork_year of at least 1. Run scenarios separately to start them all from "
+                         "the starting population.")
+        run_scenarios(args)
+    elif args.replicates:
+        run_replicates(args)
+    else:
+        run(args)
@@ -0,0 +1,24 @@
+"""
+Shared fixtures for the transition model tests.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from minos.modules import native_utils
+
+
+@pytest.fixture
+def write_model(tmp_path):
+    """ Write an exported model specification to a transitions directory and load it with native_utils.
+
+    Returns a function taking the specification (as export_transitions.R would write it) and a component name and
+    returning the loaded model.
+    """
+    def write(spec, component='model'):
+        with open(tmp_path / f"{component}.json", 'w') as spec_file:
+            json.dump(spec, spec_file)
+        return native_utils.load_transitions(component, f"{tmp_path}/")
+    return write
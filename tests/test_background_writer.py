@@ -0,0 +1,46 @@
+"""
+Output written on a background thread.
+"""
+
+import atexit
+import os
+
+import pandas as pd
+import pytest
+
+from minos.minosPipeline.output_files import BackgroundWriter, CSVWriter
+
+
+class FailingWriter:
+    extension = '.csv'
+
+    def write(self, pop, path):
+        raise OSError("disk full")
+
+
+def test_writes_queued_populations(tmp_path):
+    writer = BackgroundWriter(CSVWriter())
+    pop = pd.DataFrame({'pidp': [1, 2]})
+    writer.write(pop, str(tmp_path / "2020.csv"))
+    writer.write(pop, str(tmp_path / "2021.csv"))
+    writer.close()
+    assert sorted(os.listdir(tmp_path)) == ['2020.csv', '2021.csv']
+
+
+def test_close_unregisters_exit_handler(monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, 'register', registered.append)
+    monkeypatch.setattr(atexit, 'unregister', registered.remove)
+    writer = BackgroundWriter(CSVWriter())
+    assert registered == [writer.close]
+    writer.close()
+    assert registered == []
+    # Closing twice is harmless.
+    writer.close()
+
+
+def test_write_error_is_raised_on_close(tmp_path):
+    writer = BackgroundWriter(FailingWriter())
+    writer.write(pd.DataFrame({'pidp': [1]}), str(tmp_path / "2020.csv"))
+    with pytest.raises(RuntimeError):
+        writer.close()
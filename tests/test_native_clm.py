@@ -0,0 +1,73 @@
+"""
+Native cumulative link (clm) predictions on a small synthetic model for each supported link function.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from minos.modules import native_utils
+from transition_specs import numeric_term, factor_term
+
+# Cumulative distribution function of each link, computed independently of native_utils.inverse_links.
+LINK_CDFS = {'logit': stats.logistic.cdf,
+             'probit': stats.norm.cdf,
+             'cloglog': stats.gumbel_l.cdf,
+             'loglog': stats.gumbel_r.cdf,
+             'cauchit': stats.cauchy.cdf,
+             'log': np.exp}
+
+# Thresholds are negative and the linear predictor non-negative so every link (including log) gives valid
+# cumulative probabilities.
+THRESHOLDS = [-2.0, -1.0, -0.5]
+
+
+def clm_spec(link):
+    return {'family': 'clm',
+            'link': link,
+            'thresholds': THRESHOLDS,
+            'levels': ['1', '2', '3', '4'],
+            'intercept': [0],
+            'terms': [numeric_term('age', 0.01),
+                      factor_term('sex', ['Female', 'Male'], [[0], [0.3]])]}
+
+
+def population():
+    return pd.DataFrame({'age': [16.0, 40.0, 75.0, 30.0], 'sex': ['Female', 'Male', 'Male', 'Female']},
+                        index=[3, 5, 8, 13])
+
+
+def test_every_link_is_tested():
+    assert set(LINK_CDFS) == set(native_utils.inverse_links)
+
+
+@pytest.mark.parametrize('link', sorted(LINK_CDFS))
+def test_clm_probabilities(write_model, link):
+    model = write_model(clm_spec(link), f"clm_{link}")
+    current = population()
+    probabilities = native_utils.predict_next_timestep_clm(model, current)
+
+    eta = 0.01 * current['age'].to_numpy() + 0.3 * (current['sex'] == 'Male').to_numpy()
+    cumulative = LINK_CDFS[link](np.asarray(THRESHOLDS)[np.newaxis, :] - eta[:, np.newaxis])
+    expected = np.diff(np.hstack([np.zeros((4, 1)), cumulative, np.ones((4, 1))]), axis=1)
+
+    assert probabilities.index.equals(current.index)
+    assert list(probabilities.columns) == [0, 1, 2, 3]
+    np.testing.assert_allclose(probabilities.to_numpy(), expected, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+
+
+def test_clm_missing_covariate_gives_missing_row(write_model):
+    model = write_model(clm_spec('logit'))
+    current = population()
+    current.loc[5, 'age'] = np.nan
+    probabilities = native_utils.predict_next_timestep_clm(model, current)
+    assert probabilities.loc[5].isna().all()
+    assert probabilities.drop(index=5).notna().all().all()
+
+
+def test_clm_unknown_link_raises(write_model):
+    model = write_model(clm_spec('aranda-ordaz'))
+    with pytest.raises(ValueError):
+        native_utils.predict_next_timestep_clm(model, population())
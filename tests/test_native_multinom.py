@@ -0,0 +1,61 @@
+"""
+Native multinomial (nnet::multinom) predictions on a small synthetic model.
+"""
+
+import numpy as np
+import pandas as pd
+
+from minos.modules import native_utils
+from transition_specs import numeric_term, factor_term
+
+LEVELS = ['Employed', 'Student', 'Unemployed']
+
+
+def multinom_spec():
+    # One linear predictor per class after the baseline (Employed).
+    return {'family': 'multinom',
+            'levels': LEVELS,
+            'intercept': [0.5, -1.0],
+            'terms': [numeric_term('age', [-0.05, 0.01]),
+                      factor_term('sex', ['Female', 'Male'], [[0, 0], [0.2, -0.4]])]}
+
+
+def population():
+    return pd.DataFrame({'age': [18.0, 45.0, 67.0], 'sex': ['Male', 'Female', 'Male']}, index=[4, 6, 11])
+
+
+def expected_probabilities(current):
+    male = (current['sex'] == 'Male').to_numpy()
+    age = current['age'].to_numpy()
+    eta = np.column_stack([np.zeros(len(current)),
+                           0.5 - 0.05 * age + 0.2 * male,
+                           -1.0 + 0.01 * age - 0.4 * male])
+    return np.exp(eta) / np.exp(eta).sum(axis=1, keepdims=True)
+
+
+def test_multinom_probabilities(write_model):
+    model = write_model(multinom_spec())
+    current = population()
+    probabilities = native_utils.predict_next_timestep_multinom(model, current)
+
+    assert list(probabilities.columns) == LEVELS
+    assert probabilities.index.equals(current.index)
+    np.testing.assert_allclose(probabilities.to_numpy(), expected_probabilities(current))
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+
+
+def test_labour_and_education_use_multinom(write_model):
+    model = write_model(multinom_spec())
+    current = population()
+    expected = native_utils.predict_next_timestep_multinom(model, current)
+    pd.testing.assert_frame_equal(native_utils.predict_next_timestep_labour_nnet(model, current), expected)
+    pd.testing.assert_frame_equal(native_utils.predict_highest_educ_nnet(model, current), expected)
+
+
+def test_multinom_large_linear_predictor_does_not_overflow(write_model):
+    spec = multinom_spec()
+    spec['intercept'] = [1000.0, -1000.0]
+    model = write_model(spec)
+    probabilities = native_utils.predict_next_timestep_multinom(model, population())
+    assert np.isfinite(probabilities.to_numpy()).all()
+    np.testing.assert_allclose(probabilities['Student'], 1.0)
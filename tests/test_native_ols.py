@@ -0,0 +1,67 @@
+"""
+Native OLS predictions on a small synthetic lm model.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from minos.modules import native_utils
+from transition_specs import numeric_term, factor_term
+
+
+def ols_spec():
+    return {'family': 'ols',
+            'intercept': [100.0],
+            'terms': [numeric_term('age', 2.0),
+                      numeric_term('hh_income', 0.5, transform='scale', center=1000.0, scale=250.0),
+                      factor_term('region', ['London', 'North East', 'Wales'], [[0], [-5.0], [3.0]])]}
+
+
+def population():
+    return pd.DataFrame({'age': [20.0, 50.0, 80.0],
+                         'hh_income': [500.0, 1000.0, 2000.0],
+                         'region': ['Wales', 'London', 'North East']},
+                        index=[2, 7, 9])
+
+
+def test_ols_prediction(write_model):
+    model = write_model(ols_spec())
+    current = population()
+    prediction = native_utils.predict_next_timestep_ols(model, current, 'hh_income')
+
+    expected = (100.0 + 2.0 * current['age'] + 0.5 * (current['hh_income'] - 1000.0) / 250.0
+                + current['region'].map({'London': 0.0, 'North East': -5.0, 'Wales': 3.0}))
+    assert list(prediction.columns) == ['hh_income']
+    assert prediction.index.equals(current.index)
+    np.testing.assert_allclose(prediction['hh_income'], expected)
+
+
+def test_ols_scale_from_data_when_not_fixed(write_model):
+    spec = ols_spec()
+    spec['terms'][1] = numeric_term('hh_income', 0.5, transform='scale')
+    model = write_model(spec)
+    current = population()
+    prediction = native_utils.predict_next_timestep_ols(model, current, 'hh_income')
+
+    income = current['hh_income']
+    expected = (100.0 + 2.0 * current['age'] + 0.5 * (income - income.mean()) / income.std(ddof=1)
+                + current['region'].map({'London': 0.0, 'North East': -5.0, 'Wales': 3.0}))
+    np.testing.assert_allclose(prediction['hh_income'], expected)
+
+
+def test_ols_missing_covariate_gives_missing_prediction(write_model):
+    model = write_model(ols_spec())
+    current = population()
+    current.loc[7, 'region'] = np.nan
+    prediction = native_utils.predict_next_timestep_ols(model, current, 'hh_income')
+    assert np.isnan(prediction.loc[7, 'hh_income'])
+    assert prediction.drop(index=7)['hh_income'].notna().all()
+
+
+def test_ols_unseen_level_raises(write_model):
+    model = write_model(ols_spec())
+    current = population()
+    current.loc[2, 'region'] = 'Scotland'
+    with pytest.raises(ValueError):
+        native_utils.predict_next_timestep_ols(model, current, 'hh_income')
@@ -0,0 +1,80 @@
+"""
+Native zero inflated Poisson predictions and draws on a small synthetic pscl::zeroinfl model.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import special, stats
+
+from minos.modules import native_utils
+from transition_specs import numeric_term, factor_term
+
+
+class FakeStream:
+    """ Stand in for a vivarium randomness stream. Draws are fixed per additional key."""
+
+    def __init__(self, draws):
+        self.draws = draws
+
+    def get_draw(self, index, additional_key=None):
+        return pd.Series(self.draws[additional_key], index=index)
+
+
+def zip_spec():
+    return {'family': 'zeroinfl',
+            'dist': 'poisson',
+            'link': 'logit',
+            'count': {'intercept': [1.0],
+                      'terms': [numeric_term('age', 0.01)]},
+            'zero': {'intercept': [-0.5],
+                     'terms': [factor_term('sex', ['Female', 'Male'], [[0], [0.8]])]}}
+
+
+def population():
+    return pd.DataFrame({'age': [20.0, 40.0, 60.0, 80.0], 'sex': ['Female', 'Male', 'Female', 'Male'],
+                         'ncigs': [0, 5, 10, 0]},
+                        index=[1, 2, 3, 4])
+
+
+def test_zip_parts(write_model):
+    model = write_model(zip_spec())
+    current = population()
+    counts, zeros = native_utils.predict_zip_parts(model, current)
+    np.testing.assert_allclose(counts, np.exp(1.0 + 0.01 * current['age']))
+    np.testing.assert_allclose(zeros, special.expit(-0.5 + 0.8 * (current['sex'] == 'Male')))
+
+
+def test_draw_zip_zero_below_zero_probability():
+    counts = np.array([2.0, 2.0, 2.0, 2.0])
+    zeros = np.array([0.5, 0.5, 0.5, 0.5])
+    count_draws = np.array([0.3, 0.3, 0.9, 0.9])
+    stream = FakeStream({'zero': np.array([0.1, 0.7, 0.2, 0.8]), 'count': count_draws})
+    draws = native_utils.draw_zip(counts, zeros, pd.RangeIndex(4), stream)
+    # Draws below the zero probability are structural zeros. Others invert the Poisson CDF at the count draw.
+    expected = np.where([True, False, True, False], 0.0, stats.poisson.ppf(count_draws, counts))
+    np.testing.assert_array_equal(draws, expected)
+
+
+def test_draw_zip_zero_count_draw_is_not_negative():
+    stream = FakeStream({'zero': np.array([0.9]), 'count': np.array([0.0])})
+    assert native_utils.draw_zip(np.array([3.0]), np.array([0.1]), pd.RangeIndex(1), stream)[0] == 0
+
+
+def test_draw_zip_distribution():
+    n = 200000
+    rng = np.random.default_rng(1)
+    stream = FakeStream({'zero': rng.random(n), 'count': rng.random(n)})
+    draws = native_utils.draw_zip(np.full(n, 3.0), np.full(n, 0.3), pd.RangeIndex(n), stream)
+    assert np.all(draws == np.round(draws))
+    assert (draws == 0).mean() == pytest.approx(0.3 + 0.7 * np.exp(-3.0), abs=0.01)
+    assert draws.mean() == pytest.approx(0.7 * 3.0, abs=0.02)
+
+
+def test_tobacco_zip_rescales_draws(write_model):
+    model = write_model(zip_spec())
+    current = population()
+    stream = FakeStream({'zero': np.full(4, 0.99), 'count': np.full(4, 0.5)})
+    counts, _ = native_utils.predict_zip_parts(model, current)
+    cigarettes = native_utils.predict_next_timestep_tobacco_zip(model, current, stream)
+    np.testing.assert_array_equal(cigarettes, np.ceil(stats.poisson.ppf(0.5, counts)) * 5)
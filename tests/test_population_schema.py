@@ -0,0 +1,51 @@
+"""
+Population schema casts, including the widenings allowed once the simulation is running.
+"""
+
+import numpy as np
+import pandas as pd
+
+from minos.modules import population_schema
+from minos.modules.population_schema import PopulationSchema
+
+
+def test_money_columns_keep_their_type():
+    pop = pd.DataFrame({'hourly_wage': [12.345678901], 'hourly_rate': [9.87654321], 'alcohol_spending': [3.21]})
+    conformed = PopulationSchema().conform(pop)
+    assert (conformed.dtypes == np.float64).all()
+    pd.testing.assert_frame_equal(conformed, pop)
+
+
+def test_job_sector_stays_numeric():
+    pop = pd.DataFrame({'job_sector': [1.0, 2.0, 2.0]})
+    conformed = PopulationSchema().conform(pop)
+    assert conformed['job_sector'].dtype == np.int8
+    assert (conformed.query("job_sector == 2").index == [1, 2]).all()
+
+
+def test_out_of_range_integers_are_widened():
+    values = pd.Series([1, 300], name='nkids')
+    assert PopulationSchema.cast_integer(values, 'int8').dtype == np.int16
+    assert PopulationSchema.cast_integer(pd.Series([1, 2]), 'int8').dtype == np.int8
+
+
+def test_update_follows_widened_table_column():
+    table = pd.DataFrame({'nkids': pd.Series([1, 300], dtype='int16')})
+    update = PopulationSchema().conform(pd.DataFrame({'nkids': [2, 3]}), table)
+    assert update['nkids'].dtype == np.int16
+
+
+def test_widened_dtypes_includes_larger_integer_type():
+    schema = PopulationSchema()
+    table = pd.DataFrame({'nkids': pd.Series([1, 2], dtype='int8')})
+    update = schema.conform(pd.DataFrame({'nkids': [1, 300]}), table)
+    assert PopulationSchema.widened_dtypes(update, table) == {'nkids': np.dtype('int16')}
+
+
+def test_restore_dtypes_keeps_out_of_range_values():
+    table = pd.DataFrame({'nkids': pd.Series([1, 300], dtype='int16')})
+    population_schema.restore_dtypes(table, {'nkids': np.dtype('int8')})
+    assert table['nkids'].dtype == np.int16
+    table.loc[1, 'nkids'] = 3
+    population_schema.restore_dtypes(table, {'nkids': np.dtype('int8')})
+    assert table['nkids'].dtype == np.int8
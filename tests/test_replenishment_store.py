@@ -0,0 +1,33 @@
+"""
+Replenishing population split by year and read ahead.
+"""
+
+import pandas as pd
+
+from minos.modules.replenishment_store import ReplenishmentStore
+
+
+def write_source(tmp_path):
+    source = tmp_path / "replenishing.csv"
+    pd.DataFrame({'pidp': [1, 2, 3], 'time': [2020, 2020, 2021], 'age': [16, 16, 16]}).to_csv(source, index=False)
+    return str(source)
+
+
+def test_cohorts_by_year(tmp_path):
+    store = ReplenishmentStore(write_source(tmp_path), prefetch=False)
+    assert store.years() == [2020, 2021]
+    assert list(store.get(2020)['pidp']) == [1, 2]
+    assert store.get(2030).empty
+    assert store.executor is None
+
+
+def test_close_stops_reading_ahead(tmp_path):
+    store = ReplenishmentStore(write_source(tmp_path))
+    assert list(store.get(2020)['pidp']) == [1, 2]
+    assert 2021 in store.pending
+    store.close()
+    assert store.executor is None
+    assert store.pending == {}
+    # A closed store still reads cohorts when asked.
+    assert list(store.get(2021)['pidp']) == [3]
+    store.close()
@@ -0,0 +1,66 @@
+"""
+Native transition model predictions against R on the saved (fitted and exported) models.
+
+Skipped if rpy2 is not installed or the models and starting cohort have not been generated (make transitions).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("rpy2")
+
+from minos.validation import transition_parity
+
+TRANSITION_DIR = "data/transitions/"
+COHORT = "data/final_US/2018_US_cohort.csv"
+# Rows of the starting cohort predicted for. Enough to cover every level of the model covariates.
+SAMPLE_ROWS = 5000
+TOLERANCE = 1e-8
+
+
+@pytest.fixture(scope='module')
+def cohort():
+    if not os.path.exists(COHORT):
+        pytest.skip(f"{COHORT} has not been generated.")
+    return pd.read_csv(COHORT, low_memory=False).head(SAMPLE_ROWS)
+
+
+def saved_models(family):
+    """ Exported models of a family in the transitions directory. Skips the test if there are none."""
+    if not os.path.isdir(TRANSITION_DIR):
+        pytest.skip(f"No transition models in {TRANSITION_DIR}. Run make transitions.")
+    components = [component for component in transition_parity.find_components(TRANSITION_DIR)
+                  if transition_parity.native_utils.load_transitions(component, TRANSITION_DIR)['family'] == family]
+    if not components:
+        pytest.skip(f"No exported {family} models in {TRANSITION_DIR}.")
+    return components
+
+
+def assert_parity(family, cohort):
+    for component in saved_models(family):
+        r_prediction, native_prediction = transition_parity.comparisons[family](component, cohort, TRANSITION_DIR)
+        np.testing.assert_array_equal(np.isnan(r_prediction), np.isnan(native_prediction), err_msg=component)
+        np.testing.assert_allclose(native_prediction, r_prediction, rtol=0, atol=TOLERANCE, err_msg=component)
+
+
+def test_clm_matches_ordinal_predict(cohort):
+    """ State probabilities from predict_next_timestep_clm match ordinal's predict.clm(type="prob")."""
+    assert_parity('clm', cohort)
+
+
+def test_ols_matches_lm_predict(cohort):
+    """ Predictions from predict_next_timestep_ols match R's predict.lm."""
+    assert_parity('ols', cohort)
+
+
+def test_multinom_matches_nnet_predict(cohort):
+    """ Class probabilities from predict_next_timestep_multinom match nnet's predict.multinom(type="probs")."""
+    assert_parity('multinom', cohort)
+
+
+def test_zeroinfl_matches_pscl_predict(cohort):
+    """ Count means and zero probabilities from predict_zip_parts match pscl's predict.zeroinfl."""
+    assert_parity('zeroinfl', cohort)
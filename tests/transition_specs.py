@@ -0,0 +1,17 @@
+"""
+Builders for exported transition model terms, in the form minos/transitions/export_transitions.R writes them.
+"""
+
+import numpy as np
+
+
+def numeric_term(column, coefficients, transform='identity', center=None, scale=None):
+    """ Exported numeric term. coefficients has one value per linear predictor output."""
+    return {'label': column, 'column': column, 'type': 'numeric', 'transform': transform, 'center': center,
+            'scale': scale, 'coefficients': [[float(value) for value in np.atleast_1d(coefficients)]]}
+
+
+def factor_term(column, levels, coefficients):
+    """ Exported factor term. coefficients has one row per level (the reference level's row is zeros)."""
+    return {'label': column, 'column': column, 'type': 'factor', 'levels': levels,
+            'coefficients': [[float(value) for value in np.atleast_1d(row)] for row in coefficients]}